@@ -0,0 +1,79 @@
+"""Brightness control for built-in panels via /sys/class/backlight."""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+BACKLIGHT_DIR = Path('/sys/class/backlight')
+
+# Backlight interface types, most preferred first, as the kernel ABI docs recommend
+_TYPE_PREFERENCE = ('firmware', 'platform', 'raw')
+
+
+class BacklightError(Exception):
+    """Exception raised for backlight errors."""
+    pass
+
+
+class BacklightBackend:
+    """Reads and writes panel brightness through sysfs.
+
+    Writing ``brightness`` usually requires root, so unprivileged writes go
+    through systemd-logind's ``SetBrightness`` call instead.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = base_dir or BACKLIGHT_DIR
+
+    def list_devices(self) -> List[str]:
+        """List backlight devices, e.g. ``intel_backlight``.
+
+        A panel often has several interfaces (say ``acpi_video0`` and
+        ``intel_backlight``); only those of the most preferred type are listed
+        so each panel is controlled once.
+        """
+        if not self.base_dir.is_dir():
+            return []
+
+        by_type: Dict[str, List[str]] = {}
+        for path in self.base_dir.iterdir():
+            if not (path / 'max_brightness').exists():
+                continue
+            try:
+                kind = (path / 'type').read_text().strip()
+            except OSError:
+                kind = 'raw'
+            by_type.setdefault(kind, []).append(path.name)
+
+        for kind in _TYPE_PREFERENCE:
+            if kind in by_type:
+                return sorted(by_type[kind])
+        return sorted(name for names in by_type.values() for name in names)
+
+    def get_brightness(self, device: str) -> Tuple[int, int]:
+        """Get current and maximum raw brightness."""
+        try:
+            current = int((self.base_dir / device / 'brightness').read_text())
+            maximum = int((self.base_dir / device / 'max_brightness').read_text())
+        except (OSError, ValueError) as e:
+            raise BacklightError(f"Failed to read brightness of {device}: {e}")
+        return current, maximum
+
+    def set_brightness(self, device: str, value: int) -> None:
+        """Set raw brightness."""
+        try:
+            (self.base_dir / device / 'brightness').write_text(str(value))
+            return
+        except PermissionError:
+            pass
+        except OSError as e:
+            raise BacklightError(f"Failed to set brightness of {device}: {e}")
+
+        cmd = ['busctl', 'call', 'org.freedesktop.login1',
+               '/org/freedesktop/login1/session/auto', 'org.freedesktop.login1.Session',
+               'SetBrightness', 'ssu', 'backlight', device, str(value)]
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+            raise BacklightError(f"Failed to set brightness of {device} via logind: {e}")
@@ -1,15 +1,32 @@
 """Command-line interface for monitor control."""
 
 import click
-from typing import Optional
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from .ddc import DDCController, DDCError, Monitor, DDCFeature
+# rich and the DDC backend are imported inside the commands that use them,
+# so `--help` and hotkey-driven invocations don't pay for them up front
+if TYPE_CHECKING:
+    from .ddc import DDCController, Monitor
 
 
-console = Console()
+class _LazyConsole:
+    """Creates the rich Console on first use."""
+    
+    def __init__(self):
+        self._console = None
+    
+    def get(self) -> Any:
+        """Get the underlying rich Console."""
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+
+console = _LazyConsole()
 
 
 @click.group()
@@ -20,19 +37,24 @@ def main():
 
 
 @main.command()
-def detect():
+@click.option('--no-cache', is_flag=True, help='Ignore cached detection results')
+def detect(no_cache: bool = False):
     """Detect available monitors."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    from .ddc import DDCController, DDCError
+    
     controller = DDCController()
     
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console,
+        console=console.get(),
     ) as progress:
         task = progress.add_task("Detecting monitors...", total=None)
         
         try:
-            monitors = controller.detect_monitors()
+            monitors = controller.detect_monitors(refresh=no_cache)
         except DDCError as e:
             console.print(f"[red]Error: {e}[/red]")
             return
@@ -65,19 +87,22 @@ def detect():
 @main.command()
 @click.option('--bus', type=int, help='Monitor bus number (use detect command to find)')
 @click.option('--value', type=int, help='Brightness value to set (0-100)')
-def brightness(bus: Optional[int], value: Optional[int]):
+@click.option('--no-cache', is_flag=True, help='Ignore cached detection results')
+def brightness(bus: Optional[int], value: Optional[int], no_cache: bool):
     """Get or set monitor brightness."""
+    from .ddc import DDCController, DDCError
+    
     controller = DDCController()
     
     try:
-        monitors = controller.detect_monitors()
+        monitors = controller.detect_monitors(refresh=no_cache)
         if not monitors:
             console.print("[red]No monitors detected.[/red]")
             return
         
         # Select monitor
         if bus is not None:
-            monitor = next((m for m in monitors if m.bus == bus), None)
+            monitor = controller.get_monitor(bus)
             if not monitor:
                 console.print(f"[red]Monitor with bus {bus} not found.[/red]")
                 return
@@ -116,19 +141,22 @@ def brightness(bus: Optional[int], value: Optional[int]):
 @main.command()
 @click.option('--bus', type=int, help='Monitor bus number (use detect command to find)')
 @click.option('--value', type=int, help='Contrast value to set (0-100)')
-def contrast(bus: Optional[int], value: Optional[int]):
+@click.option('--no-cache', is_flag=True, help='Ignore cached detection results')
+def contrast(bus: Optional[int], value: Optional[int], no_cache: bool):
     """Get or set monitor contrast."""
+    from .ddc import DDCController, DDCError
+    
     controller = DDCController()
     
     try:
-        monitors = controller.detect_monitors()
+        monitors = controller.detect_monitors(refresh=no_cache)
         if not monitors:
             console.print("[red]No monitors detected.[/red]")
             return
         
         # Select monitor
         if bus is not None:
-            monitor = next((m for m in monitors if m.bus == bus), None)
+            monitor = controller.get_monitor(bus)
             if not monitor:
                 console.print(f"[red]Monitor with bus {bus} not found.[/red]")
                 return
@@ -164,50 +192,82 @@ def contrast(bus: Optional[int], value: Optional[int]):
         console.print(f"[red]Error: {e}[/red]")
 
 
+def _fetch_info(controller: 'DDCController', monitor: 'Monitor') -> Dict[str, Any]:
+    """Read brightness, contrast and supported features, using None for failures."""
+    from .ddc import DDCError
+    
+    details: Dict[str, Any] = {}
+    for key, read in (('brightness', controller.get_brightness),
+                      ('contrast', controller.get_contrast),
+                      ('features', controller.get_supported_features)):
+        try:
+            details[key] = read(monitor)
+        except DDCError:
+            details[key] = None
+    return details
+
+
 @main.command()
 @click.option('--bus', type=int, help='Monitor bus number')
-def info(bus: Optional[int]):
+@click.option('--no-cache', is_flag=True, help='Ignore cached detection results')
+def info(bus: Optional[int], no_cache: bool):
     """Show detailed information about monitors."""
+    from rich.console import Group
+    from rich.table import Table
+    from .ddc import DDCController, DDCError, map_monitors
+    
     controller = DDCController()
     
     try:
-        monitors = controller.detect_monitors()
+        monitors = controller.detect_monitors(refresh=no_cache)
         if not monitors:
             console.print("[red]No monitors detected.[/red]")
             return
         
-        monitors_to_show = [monitors[0]] if bus is None and len(monitors) == 1 else \
-                          [m for m in monitors if m.bus == bus] if bus is not None else monitors
+        if bus is not None:
+            monitor = controller.get_monitor(bus)
+            monitors_to_show = [monitor] if monitor else []
+        else:
+            monitors_to_show = monitors
+        
+        details = map_monitors(lambda m: _fetch_info(controller, m), monitors_to_show)
         
-        for monitor in monitors_to_show:
-            console.print(f"\n[bold]Monitor: {monitor.name}[/bold]")
-            console.print(f"Bus: {monitor.bus}")
-            console.print(f"Manufacturer: {monitor.manufacturer}")
-            console.print(f"Model: {monitor.model}")
-            console.print(f"Serial: {monitor.serial or 'N/A'}")
+        # Build everything first and render it in a single pass
+        renderables = []
+        for monitor, monitor_details in zip(monitors_to_show, details):
+            table = Table(title=f"Monitor: {monitor.name}", title_style="bold",
+                          title_justify="left", show_header=False, box=None, padding=(0, 1, 0, 0))
+            table.add_column(no_wrap=True)
+            table.add_column()
             
-            # Get current values
-            try:
-                brightness_current, brightness_max = controller.get_brightness(monitor)
+            table.add_row("Bus:", str(monitor.bus))
+            table.add_row("Manufacturer:", monitor.manufacturer)
+            table.add_row("Model:", monitor.model)
+            table.add_row("Serial:", monitor.serial or 'N/A')
+            
+            if monitor_details['brightness'] is not None:
+                brightness_current, brightness_max = monitor_details['brightness']
                 brightness_pct = round((brightness_current / brightness_max) * 100) if brightness_max > 0 else 0
-                console.print(f"Brightness: {brightness_current}/{brightness_max} ({brightness_pct}%)")
-            except DDCError:
-                console.print("Brightness: [dim]Not available[/dim]")
+                table.add_row("Brightness:", f"{brightness_current}/{brightness_max} ({brightness_pct}%)")
+            else:
+                table.add_row("Brightness:", "[dim]Not available[/dim]")
             
-            try:
-                contrast_current, contrast_max = controller.get_contrast(monitor)
+            if monitor_details['contrast'] is not None:
+                contrast_current, contrast_max = monitor_details['contrast']
                 contrast_pct = round((contrast_current / contrast_max) * 100) if contrast_max > 0 else 0
-                console.print(f"Contrast: {contrast_current}/{contrast_max} ({contrast_pct}%)")
-            except DDCError:
-                console.print("Contrast: [dim]Not available[/dim]")
+                table.add_row("Contrast:", f"{contrast_current}/{contrast_max} ({contrast_pct}%)")
+            else:
+                table.add_row("Contrast:", "[dim]Not available[/dim]")
             
-            # Get supported features
-            try:
-                features = controller.get_supported_features(monitor)
-                feature_names = [f.name for f in features]
-                console.print(f"Supported features: {', '.join(feature_names)}")
-            except DDCError:
-                console.print("Supported features: [dim]Could not determine[/dim]")
+            if monitor_details['features'] is not None:
+                feature_names = [f.name for f in monitor_details['features']]
+                table.add_row("Supported features:", ', '.join(feature_names))
+            else:
+                table.add_row("Supported features:", "[dim]Could not determine[/dim]")
+            
+            renderables.extend(["", table])
+        
+        console.print(Group(*renderables))
     
     except DDCError as e:
         console.print(f"[red]Error: {e}[/red]")
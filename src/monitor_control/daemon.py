@@ -0,0 +1,180 @@
+"""Long-lived DDC daemon serving requests over a Unix socket.
+
+The daemon keeps one local :class:`DDCController` alive so detection results,
+libddcutil display handles and capabilities are reused across CLI invocations,
+GUI slider events and hotkeys instead of being rebuilt for every call.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import stat
+import sys
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import ipc
+from .ddc import DDCController, DDCError, DDCFeature, Monitor
+
+
+class DDCDaemon:
+    """Dispatches protocol requests to a local DDC controller."""
+
+    def __init__(self, controller: Optional[DDCController] = None):
+        self.controller = controller or DDCController(use_daemon=False)
+        self.monitors: Dict[int, Monitor] = {}
+        # One request at a time per bus; detection and other bus-less requests share a lock
+        self._bus_locks: Dict[int, threading.Lock] = {}
+        self._detect_lock = threading.Lock()
+
+    def detect(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Detect monitors.
+
+        The controller's memory TTL and EDID-keyed disk cache keep this cheap,
+        while still noticing monitors that were plugged, unplugged or moved.
+        """
+        self.monitors = {m.bus: m for m in self.controller.detect_monitors(refresh=refresh)}
+        return [asdict(m) for m in self.monitors.values()]
+
+    def _monitor(self, bus: int) -> Monitor:
+        self.detect()
+        if bus not in self.monitors:
+            self.detect(refresh=True)
+        if bus not in self.monitors:
+            raise DDCError(f"Monitor with bus {bus} not found")
+        return self.monitors[bus]
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a single request and build the reply."""
+        op = message.get('op')
+        try:
+            if op == 'detect':
+                result: Any = self.detect(bool(message.get('refresh')))
+            elif op == 'getvcp':
+                result = list(self.controller.get_value(
+                    self._monitor(message['bus']), DDCFeature(message['code'])))
+            elif op == 'setvcp':
+                self.controller.set_value(
+                    self._monitor(message['bus']), DDCFeature(message['code']), message['value'])
+                result = None
+            elif op == 'setvcps':
+                self.controller.set_values(
+                    self._monitor(message['bus']),
+                    [(DDCFeature(code), value) for code, value in message['values']])
+                result = None
+            elif op == 'capabilities':
+                features = self.controller.get_supported_features(self._monitor(message['bus']))
+                result = [f.value for f in features]
+            else:
+                return {'ok': False, 'error': f"Unknown operation: {op}"}
+        except (DDCError, KeyError, ValueError) as e:
+            return {'ok': False, 'error': str(e)}
+
+        return {'ok': True, 'result': result}
+
+    def _lock_for(self, message: Dict[str, Any]) -> threading.Lock:
+        bus = message.get('bus')
+        if not isinstance(bus, int):
+            return self._detect_lock
+        return self._bus_locks.setdefault(bus, threading.Lock())
+
+    def handle_locked(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a request while holding the lock of the bus it addresses."""
+        with self._lock_for(message):
+            return self.handle(message)
+
+    async def serve_client(self, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> None:
+        """Serve requests from one client until it disconnects."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                header = await reader.readexactly(ipc.HEADER.size)
+                (size,) = ipc.HEADER.unpack(header)
+                message = ipc.unpack(await reader.readexactly(size))
+                # A slow detection or capabilities read must not stall other clients
+                reply = await loop.run_in_executor(None, self.handle_locked, message)
+                writer.write(ipc.pack(reply))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path: Path) -> None:
+        """Listen on a Unix socket until cancelled."""
+        _check_socket_dir(path.parent)
+        if path.exists():
+            if _socket_is_live(path):
+                raise DDCError(f"Another daemon is already listening on {path}")
+            path.unlink()
+
+        # Create the socket with owner-only permissions instead of fixing them after bind
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.serve_client, path=str(path))
+        finally:
+            os.umask(umask)
+
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set_result, None)
+
+        try:
+            async with server:
+                await stop
+        finally:
+            if path.exists():
+                path.unlink()
+            self.controller.close()
+
+
+def _check_socket_dir(directory: Path) -> None:
+    """Create the socket directory if needed and make sure only we own it."""
+    # The /tmp fallback is shared with other users, who could create it first
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        raise DDCError(f"Refusing to use {directory}: not a directory owned by the current user")
+
+
+def _socket_is_live(path: Path) -> bool:
+    """Check whether something is accepting connections on a Unix socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def main():
+    """Main entry point for the DDC daemon."""
+    parser = argparse.ArgumentParser(description="Monitor Control DDC daemon")
+    parser.add_argument('--socket', type=Path, default=ipc.socket_path(),
+                        help='Path of the Unix socket to listen on')
+
+    args = parser.parse_args()
+
+    try:
+        daemon = DDCDaemon()
+        daemon.detect()
+    except DDCError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Listening on {args.socket}")
+    try:
+        asyncio.run(daemon.serve(args.socket))
+    except DDCError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
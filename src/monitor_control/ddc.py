@@ -1,10 +1,24 @@
 """DDC/CI interface for monitor control."""
 
 import subprocess
+import socket
+import functools
+import hashlib
+import json
+import os
 import re
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Dict, Optional, Sequence, Set, Tuple, TypeVar
+from dataclasses import dataclass, asdict
 from enum import Enum
+from pathlib import Path
+
+from . import ipc, libddcutil
+from .backlight import BacklightBackend, BacklightError
+from .libddcutil import LibDDCUtilError
 
 
 class DDCFeature(Enum):
@@ -13,16 +27,44 @@ class DDCFeature(Enum):
     CONTRAST = 0x12
     INPUT_SOURCE = 0x60
     POWER_MODE = 0xD6
+    
+    @property
+    def hex_code(self) -> str:
+        """VCP code as ddcutil expects it on the command line."""
+        return _FEATURE_HEX_CODES[self]
+
+
+_FEATURE_HEX_CODES = {feature: f'{feature.value:02x}' for feature in DDCFeature}
+
+
+@functools.lru_cache(maxsize=None)
+def _bus_arg(bus: int) -> str:
+    return f'--bus={bus}'
+
+
+BACKEND_DDC = 'ddc'
+BACKEND_BACKLIGHT = 'backlight'
 
 
 @dataclass
 class Monitor:
-    """Represents a detected monitor."""
+    """Represents a detected monitor.
+    
+    Built-in panels controlled through sysfs have no I2C bus; they are given
+    negative bus numbers and name their backlight device in ``device``.
+    """
     bus: int
     name: str
     manufacturer: str
     model: str
     serial: Optional[str] = None
+    backend: str = BACKEND_DDC
+    device: Optional[str] = None
+    
+    @property
+    def bus_arg(self) -> str:
+        """ddcutil option selecting this monitor's I2C bus."""
+        return _bus_arg(self.bus)
 
 
 class DDCError(Exception):
@@ -30,59 +72,491 @@ class DDCError(Exception):
     pass
 
 
+# Returned by DDCController._send when no daemon is reachable
+_NO_DAEMON = object()
+
+DRM_DIR = Path('/sys/class/drm')
+
+# Seconds before a hung ddcutil call is killed; detection and capabilities are slower
+COMMAND_TIMEOUT = 5
+DETECT_TIMEOUT = 15
+
+# Extra seconds a client waits for the daemon beyond the ddcutil timeout it runs under
+DAEMON_REPLY_MARGIN = 2.0
+
+# Seconds a client talks to monitors directly after failing to reach the daemon
+DAEMON_RETRY_INTERVAL = 5.0
+
+# Daemon operations that run detection or read capabilities
+_SLOW_OPS = frozenset({'detect', 'capabilities'})
+
+# Seconds a detection result is reused in memory before checking the disk cache again
+DETECT_CACHE_TTL = 2.0
+
+# Seconds a value read from or written to a monitor is trusted to skip an identical
+# write; the monitor's menu or another process can change it behind our back
+VALUE_MEMORY_TTL = 5.0
+
+# Minimum spacing between DDC operations on one bus, since ddcutil can hang
+# when a monitor is hit with requests too quickly
+MIN_BUS_INTERVAL = 0.1
+
+# ddcutil's I2C sleep multiplier for getvcp/setvcp, overridable via the environment
+SLEEP_MULTIPLIER_ENV = 'MONITOR_CONTROL_SLEEP_MULT'
+DEFAULT_SLEEP_MULTIPLIER = 0.1
+
+# Patterns for parsing ddcutil output
+_DETECT_LINE_RE = re.compile(r'^(Display|I2C bus:|Monitor:|Mfg id:|Model:|Serial number:)\s*(.*)$')
+_BUS_RE = re.compile(r'/dev/i2c-(\d+)')
+_VCP_CUR_MAX_RE = re.compile(r'current value = (\d+), max value = (\d+)')
+_VCP_CUR_RE = re.compile(r'current value =\s*(\d+)')
+_VERSION_RE = re.compile(r'ddcutil\s+(\d+)\.(\d+)')
+
+# Capabilities come either as ddcutil's formatted listing ("Feature: 10 (Brightness)")
+# or as the raw MCCS string ("...vcp(02 10 12 14(05 06) 60(0F 11))...")
+_FEATURE_LINE_RE = re.compile(r'^\s*Feature:\s*([0-9a-fA-F]{2})\b', re.M)
+_VCP_SECTION_RE = re.compile(r'\bvcp\s*\(', re.I)
+_VCP_TOKEN_RE = re.compile(r'[()]|[0-9a-fA-F]{2}')
+
+# Detect output labels stored verbatim on the monitor being parsed
+_DETECT_FIELDS = {
+    'Monitor:': 'name',
+    'Mfg id:': 'manufacturer',
+    'Model:': 'model',
+    'Serial number:': 'serial',
+}
+
+
+def _edid_fingerprint() -> Optional[str]:
+    """Hash the EDIDs of all connected outputs, or None if none are readable."""
+    digest = hashlib.sha256()
+    found = False
+    
+    for edid_path in sorted(DRM_DIR.glob('card*-*/edid')):
+        try:
+            data = edid_path.read_bytes()
+        except OSError:
+            continue
+        if data:
+            digest.update(edid_path.parent.name.encode())
+            # Cached monitors are addressed by bus, which can change across reboots
+            for bus_name in _connector_buses(edid_path.parent):
+                digest.update(bus_name.encode())
+            digest.update(data)
+            found = True
+    
+    return digest.hexdigest() if found else None
+
+
+def _sleep_multiplier() -> float:
+    """Get the configured ddcutil sleep multiplier."""
+    try:
+        return float(os.environ[SLEEP_MULTIPLIER_ENV])
+    except (KeyError, ValueError):
+        return DEFAULT_SLEEP_MULTIPLIER
+
+
+@functools.lru_cache(maxsize=None)
+def _ddcutil_version(path: str) -> Optional[Tuple[int, int]]:
+    """Get the (major, minor) version of a ddcutil executable.
+    
+    The result is kept on disk, keyed by the executable's resolved path and
+    mtime, so ddcutil is only run again after it is upgraded or replaced.
+    """
+    real_path = os.path.realpath(path)
+    try:
+        key = f'{real_path}:{os.stat(real_path).st_mtime_ns}'
+    except OSError:
+        return None
+    
+    cache_file = _cache_dir() / "ddcutil-version.json"
+    try:
+        with open(cache_file, 'r') as f:
+            data = json.load(f)
+        if data.get('key') == key:
+            major, minor = data['version']
+            return int(major), int(minor)
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        pass
+    
+    try:
+        result = subprocess.run([real_path, '--version'], capture_output=True, text=True,
+                                timeout=COMMAND_TIMEOUT, close_fds=False)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_RE.search(result.stdout)
+    if not match:
+        return None
+    
+    version = int(match.group(1)), int(match.group(2))
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w') as f:
+            json.dump({'key': key, 'version': list(version)}, f)
+    except OSError:
+        pass
+    return version
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    """Kill a child process, giving up on reaping it if it is stuck in the kernel."""
+    proc.kill()
+    try:
+        proc.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        pass
+
+
+def _cache_dir() -> Path:
+    """Get the directory for on-disk caches."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(cache_home) / "monitor-control"
+
+
+def _monitor_cache_file() -> Path:
+    """Get the path of the on-disk detection cache."""
+    return _cache_dir() / "monitors.json"
+
+
+def _connector_buses(connector: Path) -> List[str]:
+    """Get the names of the I2C adapters a DRM connector talks to its display over."""
+    # HDMI/DVI connectors link their DDC adapter; DisplayPort nests its AUX adapter
+    names = [child.name for child in connector.glob('i2c-*')]
+    ddc_link = connector / 'ddc'
+    if ddc_link.exists():
+        names.append(ddc_link.resolve().name)
+    return sorted(names)
+
+
+def _bus_edid_hash(bus: int) -> Optional[str]:
+    """Hash the EDID of the connector driven over an I2C bus, if it can be found."""
+    bus_name = f'i2c-{bus}'
+    for connector in DRM_DIR.glob('card*-*'):
+        if bus_name not in _connector_buses(connector):
+            continue
+        try:
+            edid = (connector / 'edid').read_bytes()
+        except OSError:
+            return None
+        return hashlib.sha256(edid).hexdigest() if edid else None
+    return None
+
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+
+
+def map_monitors(fn: Callable[[_T], _R], monitors: Sequence[_T]) -> List[_R]:
+    """Call ``fn`` for each monitor (or per-monitor item) in parallel, in order.
+    
+    Each monitor sits on its own I2C bus, so calls for different monitors do
+    not contend; calls on one bus are still spaced by the controller.
+    """
+    if not monitors:
+        return []
+    with ThreadPoolExecutor(max_workers=len(monitors)) as executor:
+        return list(executor.map(fn, monitors))
+
+
 class DDCController:
     """Main class for controlling monitors via DDC/CI."""
     
-    def __init__(self):
-        self._check_ddcutil()
+    def __init__(self, use_daemon: bool = True):
+        self._ddcutil = self._check_ddcutil()
+        # Use libddcutil directly when available to avoid a fork per VCP call
+        self._lib = libddcutil.load()
+        self._backlight = BacklightBackend()
+        self._use_daemon = use_daemon
+        self._daemon_retry_at = 0.0
+        self._vcp_option_list: Optional[List[str]] = None
+        self._socket: Optional[socket.socket] = None
+        # The daemon connection is shared by worker threads
+        self._socket_lock = threading.Lock()
+        self._by_bus: Optional[Dict[int, Monitor]] = None
+        # Buses of monitors that came from the disk cache rather than a detection
+        self._cached_buses: Set[int] = set()
+        self._features: Dict[int, List[DDCFeature]] = {}
+        # Last value read from or written to each (bus, VCP code), with when it was seen
+        self._values: Dict[Tuple[int, int], Tuple[int, float]] = {}
+        self._detected_at = 0.0
+        self._bus_ready_at: Dict[int, float] = {}
+        self._throttle_lock = threading.Lock()
     
-    def _check_ddcutil(self) -> None:
-        """Check if ddcutil is available."""
-        try:
-            result = subprocess.run(['ddcutil', '--version'], 
-                                  capture_output=True, text=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+    def _check_ddcutil(self) -> str:
+        """Check if ddcutil is available and return its absolute path."""
+        # A PATH lookup is enough here; running ddcutil would cost a fork per controller
+        path = shutil.which('ddcutil')
+        if path is None:
             raise DDCError("ddcutil not found. Please install ddcutil package.")
+        return os.path.abspath(path)
+    
+    @property
+    def _vcp_options(self) -> List[str]:
+        """Options for getvcp/setvcp, matched to the (cached) ddcutil version on first use."""
+        if self._vcp_option_list is None:
+            options = [f'--sleep-multiplier={_sleep_multiplier()}']
+            # The bus is always given explicitly, so ddcutil can skip its own probing;
+            # the option only exists since ddcutil 2.0 and 1.x rejects it
+            version = _ddcutil_version(self._ddcutil)
+            if version is not None and version >= (2, 0):
+                options.insert(0, '--skip-ddc-checks')
+            self._vcp_option_list = options
+        return self._vcp_option_list
+    
+    def _send(self, op: str, **kwargs: Any) -> Any:
+        """Send a request to monitor-controld, connecting lazily.
+        
+        Returns ``_NO_DAEMON`` if the daemon is not running so callers can fall
+        back to talking to the monitor directly.
+        """
+        if not self._use_daemon or time.monotonic() < self._daemon_retry_at:
+            return _NO_DAEMON
+        
+        timeout = (DETECT_TIMEOUT if op in _SLOW_OPS else COMMAND_TIMEOUT) + DAEMON_REPLY_MARGIN
+        with self._socket_lock:
+            try:
+                if self._socket is None:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    sock.settimeout(timeout)
+                    try:
+                        sock.connect(str(ipc.socket_path()))
+                    except OSError:
+                        sock.close()
+                        raise
+                    self._socket = sock
+                self._socket.settimeout(timeout)
+                reply = ipc.request(self._socket, {'op': op, **kwargs})
+            except (OSError, ValueError):
+                # Daemon not running, went away or hung (socket.timeout is an OSError):
+                # go direct for a while, then try it again
+                if self._socket is not None:
+                    self._socket.close()
+                    self._socket = None
+                self._daemon_retry_at = time.monotonic() + DAEMON_RETRY_INTERVAL
+                return _NO_DAEMON
+        
+        if not reply.get('ok'):
+            raise DDCError(reply.get('error', 'Unknown daemon error'))
+        return reply.get('result')
+    
+    def close(self) -> None:
+        """Close the connection to the daemon and any open libddcutil displays."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._lib is not None:
+            self._lib.close()
+    
+    def detect_monitors(self, refresh: bool = False) -> List[Monitor]:
+        """Detect all available monitors.
+        
+        Results are cached on disk and reused while the set of connected
+        EDIDs is unchanged. Pass ``refresh=True`` to force a new detection.
+        """
+        if (not refresh and self._by_bus is not None
+                and time.monotonic() - self._detected_at < DETECT_CACHE_TTL):
+            return list(self._by_bus.values())
+        
+        if refresh:
+            # Displays may have been swapped; don't trust remembered values or handles
+            self._values.clear()
+            self._features.clear()
+            if self._lib is not None:
+                self._lib.close()
+        
+        monitors = self._detect_monitors(refresh)
+        self._by_bus = {m.bus: m for m in monitors}
+        self._detected_at = time.monotonic()
+        return monitors
     
-    def detect_monitors(self) -> List[Monitor]:
-        """Detect all available monitors."""
+    def get_monitor(self, bus: int) -> Optional[Monitor]:
+        """Get a detected monitor by bus number, detecting monitors if needed."""
+        if self._by_bus is None:
+            self.detect_monitors()
+        return self._by_bus.get(bus)
+    
+    def _detect_monitors(self, refresh: bool) -> List[Monitor]:
+        result = self._send('detect', refresh=refresh)
+        if result is not _NO_DAEMON:
+            return [Monitor(**m) for m in result]
+        
+        panels = self._detect_backlight_panels()
         try:
-            result = subprocess.run(['ddcutil', 'detect'], 
-                                  capture_output=True, text=True, check=True)
-            return self._parse_detect_output(result.stdout)
-        except subprocess.CalledProcessError as e:
-            raise DDCError(f"Failed to detect monitors: {e.stderr}")
+            return self._detect_ddc_monitors(refresh) + panels
+        except DDCError:
+            # Laptops without i2c-dev can still control their built-in panel
+            if panels:
+                return panels
+            raise
+    
+    def _detect_backlight_panels(self) -> List[Monitor]:
+        """Detect built-in panels exposed under /sys/class/backlight."""
+        return [
+            Monitor(
+                bus=-index,
+                name="Built-in Display",
+                manufacturer="Unknown",
+                model=device,
+                backend=BACKEND_BACKLIGHT,
+                device=device
+            )
+            for index, device in enumerate(self._backlight.list_devices(), start=1)
+        ]
+    
+    def _detect_ddc_monitors(self, refresh: bool) -> List[Monitor]:
+        fingerprint = _edid_fingerprint()
+        if fingerprint and not refresh:
+            cached = self._load_cached_monitors(fingerprint)
+            if cached is not None:
+                self._cached_buses = {m.bus for m in cached}
+                return cached
+        self._cached_buses = set()
+        
+        monitors = self._detect_with_library(refresh) if self._lib is not None else None
+        if monitors is None:
+            monitors = self._detect_with_ddcutil()
+        
+        if fingerprint and monitors:
+            self._save_cached_monitors(fingerprint, monitors)
+        return monitors
+    
+    def _detect_with_library(self, refresh: bool) -> Optional[List[Monitor]]:
+        """List monitors through libddcutil, or None if it can't enumerate displays."""
+        try:
+            displays = self._lib.detect(refresh)
+        except LibDDCUtilError:
+            return None
+        return [
+            self._create_monitor({'bus': bus, 'manufacturer': manufacturer,
+                                  'model': model, 'serial': serial or None})
+            for bus, manufacturer, model, serial in displays
+        ]
+    
+    def _detect_with_ddcutil(self) -> List[Monitor]:
+        """List monitors by running ``ddcutil detect``."""
+        # Parse lines as ddcutil prints them rather than buffering the whole output. Both
+        # pipes are read on threads: stderr so it can't fill up and stall ddcutil, stdout
+        # so a ddcutil stuck in I2C I/O can't block us past DETECT_TIMEOUT
+        proc = subprocess.Popen([self._ddcutil, 'detect'], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, close_fds=False)
+        parsed: List[List[Monitor]] = []
+        stderr_chunks: List[str] = []
+        readers = [
+            threading.Thread(target=lambda: parsed.append(self._parse_detect_output(proc.stdout)),
+                             daemon=True),
+            threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        
+        deadline = time.monotonic() + DETECT_TIMEOUT
+        for reader in readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+        try:
+            returncode = proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            returncode = None
+        
+        if returncode is None or any(reader.is_alive() for reader in readers):
+            _kill(proc)
+            raise DDCError("ddcutil timed out: ddcutil detect")
+        proc.stdout.close()
+        proc.stderr.close()
+        if returncode != 0:
+            raise DDCError(f"Failed to detect monitors: {''.join(stderr_chunks)}")
+        
+        return parsed[0]
+    
+    def _run(self, cmd: List[str], timeout: float = COMMAND_TIMEOUT) -> subprocess.CompletedProcess:
+        """Run a ddcutil command, raising DDCError if it hangs.
+        
+        An absolute executable and ``close_fds=False`` let CPython spawn with
+        posix_spawn instead of forking the (possibly large) calling process.
+        Our own descriptors are non-inheritable, so none leak into the child.
+        Unlike ``subprocess.run``, a child that doesn't die after being killed
+        on timeout (stuck in uninterruptible I2C I/O) is not waited for.
+        """
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, close_fds=False)
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            raise DDCError(f"ddcutil timed out: {' '.join(cmd)}")
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    
+    def _throttle(self, bus: int) -> None:
+        """Wait until at least MIN_BUS_INTERVAL has passed since the last operation on a bus."""
+        with self._throttle_lock:
+            now = time.monotonic()
+            ready_at = max(now, self._bus_ready_at.get(bus, 0.0))
+            self._bus_ready_at[bus] = ready_at + MIN_BUS_INTERVAL
+        
+        if ready_at > now:
+            time.sleep(ready_at - now)
+    
+    def _load_cached_monitors(self, fingerprint: str) -> Optional[List[Monitor]]:
+        """Load monitors from the detection cache if it matches the EDIDs."""
+        try:
+            with open(_monitor_cache_file(), 'r') as f:
+                data = json.load(f)
+            if data.get('edid_hash') != fingerprint:
+                return None
+            return [Monitor(**m) for m in data['monitors']]
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+    
+    def _save_cached_monitors(self, fingerprint: str, monitors: List[Monitor]) -> None:
+        """Write monitors to the detection cache, ignoring I/O errors."""
+        cache_file = _monitor_cache_file()
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w') as f:
+                json.dump({
+                    'edid_hash': fingerprint,
+                    'monitors': [asdict(m) for m in monitors]
+                }, f, indent=2)
+        except OSError:
+            pass
     
-    def _parse_detect_output(self, output: str) -> List[Monitor]:
-        """Parse ddcutil detect output."""
+    def _drop_cached_detection(self, bus: int) -> None:
+        """Delete the detection cache after a monitor loaded from it failed to answer."""
+        if bus not in self._cached_buses:
+            return
+        self._cached_buses = set()
+        # Force the next detect_monitors() to run ddcutil again
+        self._detected_at = 0.0
+        try:
+            _monitor_cache_file().unlink()
+        except OSError:
+            pass
+    
+    def _parse_detect_output(self, lines: Iterable[str]) -> List[Monitor]:
+        """Parse ddcutil detect output line by line."""
         monitors = []
         current_monitor = {}
         
-        for line in output.split('\n'):
-            line = line.strip()
+        for line in lines:
+            match = _DETECT_LINE_RE.match(line.strip())
+            if not match:
+                continue
             
-            if line.startswith('Display'):
+            label, value = match.groups()
+            if label == 'Display':
                 if current_monitor:
                     monitors.append(self._create_monitor(current_monitor))
                     current_monitor = {}
             
-            elif line.strip().startswith('I2C bus:'):
+            elif label == 'I2C bus:':
                 # Extract bus number from I2C bus line
-                bus_match = re.search(r'/dev/i2c-(\d+)', line)
+                bus_match = _BUS_RE.search(value)
                 if bus_match:
                     current_monitor['bus'] = int(bus_match.group(1))
             
-            elif line.startswith('Monitor:'):
-                current_monitor['name'] = line.split(':', 1)[1].strip()
-            
-            elif line.startswith('Mfg id:'):
-                current_monitor['manufacturer'] = line.split(':', 1)[1].strip()
-            
-            elif line.startswith('Model:'):
-                current_monitor['model'] = line.split(':', 1)[1].strip()
-            
-            elif line.startswith('Serial number:'):
-                current_monitor['serial'] = line.split(':', 1)[1].strip()
+            else:
+                current_monitor[_DETECT_FIELDS[label]] = value.strip()
         
         if current_monitor:
             monitors.append(self._create_monitor(current_monitor))
@@ -117,34 +591,144 @@ class DDCController:
     
     def get_value(self, monitor: Monitor, feature: DDCFeature) -> Tuple[int, int]:
         """Get current and maximum value for a feature."""
-        try:
-            cmd = ['ddcutil', f'--bus={monitor.bus}', 'getvcp', f'{feature.value:02x}']
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return self._parse_value_output(result.stdout)
-        except subprocess.CalledProcessError as e:
-            raise DDCError(f"Failed to get value for feature {feature.name}: {e.stderr}")
+        if monitor.backend == BACKEND_BACKLIGHT:
+            self._check_backlight_feature(monitor, feature)
+            try:
+                return self._backlight.get_brightness(monitor.device)
+            except BacklightError as e:
+                raise DDCError(str(e))
+        
+        result = self._send('getvcp', bus=monitor.bus, code=feature.value)
+        if result is not _NO_DAEMON:
+            return result[0], result[1]
+        
+        self._throttle(monitor.bus)
+        
+        if self._lib is not None:
+            try:
+                current, maximum = self._lib.get_value(monitor.bus, feature.value)
+            except LibDDCUtilError as e:
+                self._drop_cached_detection(monitor.bus)
+                raise DDCError(f"Failed to get value for feature {feature.name}: {e}")
+        else:
+            try:
+                cmd = [self._ddcutil, monitor.bus_arg, *self._vcp_options, 'getvcp', feature.hex_code]
+                result = self._run(cmd)
+            except subprocess.CalledProcessError as e:
+                self._drop_cached_detection(monitor.bus)
+                raise DDCError(f"Failed to get value for feature {feature.name}: {e.stderr}")
+            current, maximum = self._parse_value_output(result.stdout)
+        
+        self._remember_value(monitor.bus, feature.value, current)
+        return current, maximum
     
     def _parse_value_output(self, output: str) -> Tuple[int, int]:
         """Parse ddcutil getvcp output."""
         # Example: "VCP code 0x10 (Brightness): current value = 50, max value = 100"
-        match = re.search(r'current value = (\d+), max value = (\d+)', output)
+        match = _VCP_CUR_MAX_RE.search(output)
         if match:
             return int(match.group(1)), int(match.group(2))
         
         # Alternative format for some monitors
-        match = re.search(r'current value =\s*(\d+)', output)
+        match = _VCP_CUR_RE.search(output)
         if match:
             return int(match.group(1)), 100  # Assume max 100 if not specified
         
         raise DDCError(f"Could not parse value output: {output}")
     
     def set_value(self, monitor: Monitor, feature: DDCFeature, value: int) -> None:
-        """Set value for a feature."""
+        """Set value for a feature.
+        
+        For built-in panels the value is a percentage of the panel's maximum.
+        Writing the value this controller read or wrote within the last
+        VALUE_MEMORY_TTL seconds is skipped.
+        """
+        if monitor.backend == BACKEND_BACKLIGHT:
+            self._check_backlight_feature(monitor, feature)
+            try:
+                _, maximum = self._backlight.get_brightness(monitor.device)
+                # Raw 0 switches the backlight off on most panels; keep it dimly lit
+                self._backlight.set_brightness(monitor.device, max(1, round(value * maximum / 100)))
+            except BacklightError as e:
+                raise DDCError(str(e))
+            return
+        
+        if self._send('setvcp', bus=monitor.bus, code=feature.value, value=value) is not _NO_DAEMON:
+            return
+        
+        if self._holds_value(monitor.bus, feature.value, value):
+            return
+        
+        self._throttle(monitor.bus)
+        
+        if self._lib is not None:
+            try:
+                self._lib.set_value(monitor.bus, feature.value, value)
+            except LibDDCUtilError as e:
+                self._drop_cached_detection(monitor.bus)
+                raise DDCError(f"Failed to set value for feature {feature.name}: {e}")
+        else:
+            try:
+                cmd = [self._ddcutil, monitor.bus_arg, *self._vcp_options, '--noverify',
+                       'setvcp', feature.hex_code, str(value)]
+                self._run(cmd)
+            except subprocess.CalledProcessError as e:
+                self._drop_cached_detection(monitor.bus)
+                raise DDCError(f"Failed to set value for feature {feature.name}: {e.stderr}")
+        
+        self._remember_value(monitor.bus, feature.value, value)
+    
+    def set_values(self, monitor: Monitor, values: List[Tuple[DDCFeature, int]]) -> None:
+        """Set several features at once.
+        
+        Over ddcutil 2.0+ all pairs go in a single ``setvcp`` call, saving a
+        process start and bus handshake per extra feature; older versions only
+        take one pair per call.
+        """
+        if len(values) < 2 or monitor.backend == BACKEND_BACKLIGHT:
+            for feature, value in values:
+                self.set_value(monitor, feature, value)
+            return
+        
+        pairs = [[feature.value, value] for feature, value in values]
+        if self._send('setvcps', bus=monitor.bus, values=pairs) is not _NO_DAEMON:
+            return
+        
+        changed = [(feature, value) for feature, value in values
+                   if not self._holds_value(monitor.bus, feature.value, value)]
+        version = _ddcutil_version(self._ddcutil)
+        if len(changed) < 2 or self._lib is not None or version is None or version < (2, 0):
+            for feature, value in changed:
+                self.set_value(monitor, feature, value)
+            return
+        
+        self._throttle(monitor.bus)
+        
+        cmd = [self._ddcutil, monitor.bus_arg, *self._vcp_options, '--noverify', 'setvcp']
+        for feature, value in changed:
+            cmd += [feature.hex_code, str(value)]
         try:
-            cmd = ['ddcutil', f'--bus={monitor.bus}', 'setvcp', f'{feature.value:02x}', str(value)]
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            self._run(cmd)
         except subprocess.CalledProcessError as e:
-            raise DDCError(f"Failed to set value for feature {feature.name}: {e.stderr}")
+            self._drop_cached_detection(monitor.bus)
+            names = ', '.join(feature.name for feature, _ in changed)
+            raise DDCError(f"Failed to set values for features {names}: {e.stderr}")
+        
+        for feature, value in changed:
+            self._remember_value(monitor.bus, feature.value, value)
+    
+    def _remember_value(self, bus: int, code: int, value: int) -> None:
+        self._values[(bus, code)] = (value, time.monotonic())
+    
+    def _holds_value(self, bus: int, code: int, value: int) -> bool:
+        """Whether a monitor is known to hold a value, from a recent read or write."""
+        seen = self._values.get((bus, code))
+        return (seen is not None and seen[0] == value
+                and time.monotonic() - seen[1] < VALUE_MEMORY_TTL)
+    
+    def _check_backlight_feature(self, monitor: Monitor, feature: DDCFeature) -> None:
+        if feature != DDCFeature.BRIGHTNESS:
+            raise DDCError(f"{feature.name} is not supported by {monitor.name}")
     
     def get_brightness(self, monitor: Monitor) -> Tuple[int, int]:
         """Get current and maximum brightness."""
@@ -163,22 +747,94 @@ class DDCController:
         self.set_value(monitor, DDCFeature.CONTRAST, value)
     
     def get_supported_features(self, monitor: Monitor) -> List[DDCFeature]:
-        """Get list of supported features for a monitor."""
+        """Get list of supported features for a monitor.
+        
+        Capabilities never change for a display, so results are kept for the
+        lifetime of the controller and cached on disk keyed by EDID.
+        """
+        if monitor.backend == BACKEND_BACKLIGHT:
+            return [DDCFeature.BRIGHTNESS]
+        
+        if monitor.bus in self._features:
+            return list(self._features[monitor.bus])
+        
+        result = self._send('capabilities', bus=monitor.bus)
+        if result is not _NO_DAEMON:
+            features = [DDCFeature(code) for code in result]
+            self._features[monitor.bus] = features
+            return list(features)
+        
+        edid_hash = _bus_edid_hash(monitor.bus)
+        features = self._load_cached_features(edid_hash) if edid_hash else None
+        if features is None:
+            capabilities = self._read_capabilities(monitor)
+            if capabilities is None:
+                # Fallback to common features, without caching the guess
+                return [DDCFeature.BRIGHTNESS, DDCFeature.CONTRAST]
+            features = self._parse_capabilities(capabilities)
+            if edid_hash:
+                self._save_cached_features(edid_hash, capabilities, features)
+        
+        self._features[monitor.bus] = features
+        return list(features)
+    
+    def _read_capabilities(self, monitor: Monitor) -> Optional[str]:
+        """Read the capabilities of a monitor, or None if it does not answer."""
+        if self._lib is not None:
+            try:
+                return self._lib.get_capabilities(monitor.bus)
+            except LibDDCUtilError:
+                return None
+        
+        try:
+            cmd = [self._ddcutil, monitor.bus_arg, 'capabilities']
+            return self._run(cmd, timeout=DETECT_TIMEOUT).stdout
+        except (subprocess.CalledProcessError, DDCError):
+            return None
+    
+    def _load_cached_features(self, edid_hash: str) -> Optional[List[DDCFeature]]:
+        """Load features from the capabilities cache for a display."""
+        try:
+            with open(_cache_dir() / f"caps-{edid_hash}.json", 'r') as f:
+                data = json.load(f)
+            return [DDCFeature(code) for code in data['features']]
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+    
+    def _save_cached_features(self, edid_hash: str, capabilities: str,
+                              features: List[DDCFeature]) -> None:
+        """Write a display's capabilities to the cache, ignoring I/O errors."""
         try:
-            cmd = ['ddcutil', f'--bus={monitor.bus}', 'capabilities']
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return self._parse_capabilities(result.stdout)
-        except subprocess.CalledProcessError:
-            # Fallback to common features
-            return [DDCFeature.BRIGHTNESS, DDCFeature.CONTRAST]
+            _cache_dir().mkdir(parents=True, exist_ok=True)
+            with open(_cache_dir() / f"caps-{edid_hash}.json", 'w') as f:
+                json.dump({
+                    'capabilities': capabilities,
+                    'features': [feature.value for feature in features]
+                }, f, indent=2)
+        except OSError:
+            pass
     
     def _parse_capabilities(self, output: str) -> List[DDCFeature]:
         """Parse capabilities output to find supported features."""
-        supported = []
+        codes = self._parse_vcp_codes(output)
+        return [feature for feature in DDCFeature if feature.value in codes]
+    
+    def _parse_vcp_codes(self, output: str) -> Set[int]:
+        """Collect the VCP codes listed in capabilities output."""
+        codes = {int(code, 16) for code in _FEATURE_LINE_RE.findall(output)}
         
-        # Look for VCP codes in capabilities string
-        for feature in DDCFeature:
-            if f'{feature.value:02x}' in output.lower() or f'{feature.value:02X}' in output:
-                supported.append(feature)
+        section = _VCP_SECTION_RE.search(output)
+        if section:
+            # Only top-level codes are features; nested lists are allowed values
+            depth = 1
+            for token in _VCP_TOKEN_RE.findall(output, section.end()):
+                if token == '(':
+                    depth += 1
+                elif token == ')':
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif depth == 1:
+                    codes.add(int(token, 16))
         
-        return supported
\ No newline at end of file
+        return codes
\ No newline at end of file
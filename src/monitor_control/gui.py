@@ -2,7 +2,8 @@
 
 import sys
 import math
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
     QLabel, QSlider, QPushButton, QComboBox, QGroupBox, QGridLayout,
@@ -11,33 +12,132 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QIcon, QAction, QPixmap, QPainter, QPen, QBrush
 
-from .ddc import DDCController, DDCError, Monitor, DDCFeature
+from .ddc import BACKEND_BACKLIGHT, DDCController, DDCError, Monitor, DDCFeature, map_monitors
+
+
+def read_percentage(controller: DDCController, monitor: Monitor,
+                    feature: DDCFeature) -> Optional[int]:
+    """Read a feature as a percentage, or None if the monitor does not answer."""
+    try:
+        current, maximum = controller.get_value(monitor, feature)
+    except DDCError:
+        return None
+    return round((current / maximum) * 100) if maximum > 0 else 50
 
 
 class MonitorDetectionWorker(QThread):
     """Worker thread for monitor detection."""
-    monitors_detected = pyqtSignal(list)
+    # Emits the monitors and their (brightness, contrast) percentages
+    monitors_detected = pyqtSignal(list, list)
     error_occurred = pyqtSignal(str)
     
+    def __init__(self, controller: DDCController, refresh: bool = False):
+        super().__init__()
+        self.controller = controller
+        self.refresh = refresh
+    
     def run(self):
         try:
-            controller = DDCController()
-            monitors = controller.detect_monitors()
-            self.monitors_detected.emit(monitors)
+            monitors = self.controller.detect_monitors(refresh=self.refresh)
+            self.monitors_detected.emit(monitors, self.read_values(self.controller, monitors))
         except DDCError as e:
             self.error_occurred.emit(str(e))
+    
+    def read_values(self, controller: DDCController,
+                    monitors: List[Monitor]) -> List[Tuple[Optional[int], Optional[int]]]:
+        """Read brightness and contrast of all monitors in parallel."""
+        def fetch(monitor: Monitor) -> Tuple[Optional[int], Optional[int]]:
+            return (read_percentage(controller, monitor, DDCFeature.BRIGHTNESS),
+                    read_percentage(controller, monitor, DDCFeature.CONTRAST))
+        
+        return map_monitors(fetch, monitors)
+
+
+class MonitorWorker(QThread):
+    """Worker thread that serializes DDC writes for one monitor.
+    
+    Only the latest value per feature is kept, so writes queued while the
+    monitor is busy collapse into one.
+    """
+    error_occurred = pyqtSignal(str)
+    # How long quitting waits for queued writes to finish, in milliseconds
+    STOP_TIMEOUT_MS = 2000
+    
+    def __init__(self, controller: DDCController, monitor: Monitor):
+        # Owned by the application so a worker still finishing its writes
+        # outlives the widget that started it
+        super().__init__(QApplication.instance())
+        self.controller = controller
+        self.monitor = monitor
+        self._pending: Dict[DDCFeature, int] = {}
+        self._condition = threading.Condition()
+        self._stopping = False
+        self.finished.connect(self.deleteLater)
+    
+    def enqueue(self, feature: DDCFeature, value: int):
+        """Queue a write, replacing any pending write of the same feature."""
+        with self._condition:
+            self._pending.pop(feature, None)
+            self._pending[feature] = value
+            self._condition.notify()
+    
+    def stop(self, timeout_ms: int = 0) -> bool:
+        """Stop the worker once its queued writes are done.
+        
+        Waits at most ``timeout_ms`` for that, so a hung write can't freeze
+        the caller, and returns whether the worker has finished.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        return self.wait(timeout_ms)
+    
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                feature = next(iter(self._pending))
+                value = self._pending.pop(feature)
+            
+            try:
+                self.controller.set_value(self.monitor, feature, value)
+            except DDCError as e:
+                self.error_occurred.emit(f"Failed to set {feature.name.lower()}: {e}")
 
 
 class MonitorControlWidget(QWidget):
     """Widget for controlling a single monitor."""
+    # Delay before a slider value is written, so a drag produces a single write
+    WRITE_DELAY_MS = 80
     
-    def __init__(self, monitor: Monitor, controller: DDCController):
+    def __init__(self, monitor: Monitor, controller: DDCController,
+                 values: Optional[Tuple[Optional[int], Optional[int]]] = None):
         super().__init__()
         self.monitor = monitor
         self.controller = controller
         self.updating = False
+        
+        self._pending_brightness = 0
+        self._brightness_timer = QTimer(self)
+        self._brightness_timer.setSingleShot(True)
+        self._brightness_timer.timeout.connect(self._flush_brightness)
+        
+        self._pending_contrast = 0
+        self._contrast_timer = QTimer(self)
+        self._contrast_timer.setSingleShot(True)
+        self._contrast_timer.timeout.connect(self._flush_contrast)
+        
+        # Writes run off the UI thread, one at a time per monitor
+        self.worker = MonitorWorker(controller, monitor)
+        self.worker.error_occurred.connect(self.on_write_failed)
+        self.worker.start()
+        QApplication.instance().aboutToQuit.connect(self._on_quit)
+        
         self.init_ui()
-        self.load_current_values()
+        self.load_current_values(values)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -84,6 +184,8 @@ class MonitorControlWidget(QWidget):
         
         contrast_group.setLayout(contrast_layout)
         layout.addWidget(contrast_group)
+        # Built-in panels only expose a backlight
+        contrast_group.setVisible(self.monitor.backend != BACKEND_BACKLIGHT)
         
         # Quick preset buttons
         presets_group = QGroupBox("Quick Presets")
@@ -107,29 +209,25 @@ class MonitorControlWidget(QWidget):
         
         self.setLayout(layout)
     
-    def load_current_values(self):
-        """Load current brightness and contrast values from monitor."""
+    def load_current_values(self, values: Optional[Tuple[Optional[int], Optional[int]]] = None):
+        """Load current brightness and contrast values.
+        
+        Uses pre-fetched percentages when given, otherwise queries the monitor.
+        """
+        if values is None:
+            values = (read_percentage(self.controller, self.monitor, DDCFeature.BRIGHTNESS),
+                      read_percentage(self.controller, self.monitor, DDCFeature.CONTRAST))
+        brightness, contrast = values
+        
         self.updating = True
         
-        try:
-            # Get brightness
-            current, maximum = self.controller.get_brightness(self.monitor)
-            percentage = round((current / maximum) * 100) if maximum > 0 else 50
-            self.brightness_slider.setValue(percentage)
-            self.brightness_label.setText(f"{percentage}%")
-        except DDCError:
-            self.brightness_slider.setValue(50)
-            self.brightness_label.setText("50%")
+        brightness = 50 if brightness is None else brightness
+        self.brightness_slider.setValue(brightness)
+        self.brightness_label.setText(f"{brightness}%")
         
-        try:
-            # Get contrast
-            current, maximum = self.controller.get_contrast(self.monitor)
-            percentage = round((current / maximum) * 100) if maximum > 0 else 50
-            self.contrast_slider.setValue(percentage)
-            self.contrast_label.setText(f"{percentage}%")
-        except DDCError:
-            self.contrast_slider.setValue(50)
-            self.contrast_label.setText("50%")
+        contrast = 50 if contrast is None else contrast
+        self.contrast_slider.setValue(contrast)
+        self.contrast_label.setText(f"{contrast}%")
         
         self.updating = False
     
@@ -139,11 +237,8 @@ class MonitorControlWidget(QWidget):
             return
         
         self.brightness_label.setText(f"{value}%")
-        
-        try:
-            self.controller.set_brightness(self.monitor, value)
-        except DDCError as e:
-            QMessageBox.warning(self, "Error", f"Failed to set brightness: {e}")
+        self._pending_brightness = value
+        self._brightness_timer.start(self.WRITE_DELAY_MS)
     
     def on_contrast_changed(self, value: int):
         """Handle contrast slider change."""
@@ -151,11 +246,39 @@ class MonitorControlWidget(QWidget):
             return
         
         self.contrast_label.setText(f"{value}%")
-        
-        try:
-            self.controller.set_contrast(self.monitor, value)
-        except DDCError as e:
-            QMessageBox.warning(self, "Error", f"Failed to set contrast: {e}")
+        self._pending_contrast = value
+        self._contrast_timer.start(self.WRITE_DELAY_MS)
+    
+    def _flush_brightness(self):
+        """Write the last brightness value once the slider settles."""
+        self.worker.enqueue(DDCFeature.BRIGHTNESS, self._pending_brightness)
+    
+    def _flush_contrast(self):
+        """Write the last contrast value once the slider settles."""
+        self.worker.enqueue(DDCFeature.CONTRAST, self._pending_contrast)
+    
+    def on_write_failed(self, message: str):
+        """Report a failed write from the worker thread."""
+        QMessageBox.warning(self, "Error", message)
+    
+    def flush_pending(self):
+        """Queue slider values still waiting for their debounce timer."""
+        if self._brightness_timer.isActive():
+            self._brightness_timer.stop()
+            self._flush_brightness()
+        if self._contrast_timer.isActive():
+            self._contrast_timer.stop()
+            self._flush_contrast()
+    
+    def shutdown(self):
+        """Stop the widget's worker without waiting; it finishes its writes in the background."""
+        QApplication.instance().aboutToQuit.disconnect(self._on_quit)
+        self.flush_pending()
+        self.worker.stop()
+    
+    def _on_quit(self):
+        self.flush_pending()
+        self.worker.stop(MonitorWorker.STOP_TIMEOUT_MS)
     
     def set_preset(self, brightness: int, contrast: int):
         """Set brightness and contrast to preset values."""
@@ -166,9 +289,9 @@ class MonitorControlWidget(QWidget):
 class MainWindow(QMainWindow):
     """Main application window."""
     
-    def __init__(self):
+    def __init__(self, controller: Optional[DDCController] = None):
         super().__init__()
-        self.controller = DDCController()
+        self.controller = controller or DDCController()
         self.monitors: List[Monitor] = []
         self.monitor_widgets: List[MonitorControlWidget] = []
         self.init_ui()
@@ -192,7 +315,7 @@ class MainWindow(QMainWindow):
         
         # Refresh button
         refresh_btn = QPushButton("Refresh Monitors")
-        refresh_btn.clicked.connect(self.detect_monitors)
+        refresh_btn.clicked.connect(lambda: self.detect_monitors(refresh=True))
         layout.addWidget(refresh_btn)
         
         # Progress bar for loading
@@ -294,7 +417,7 @@ class MainWindow(QMainWindow):
         painter.end()
         return QIcon(pixmap)
     
-    def detect_monitors(self):
+    def detect_monitors(self, refresh: bool = False):
         """Start monitor detection in background thread."""
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate progress
@@ -302,16 +425,18 @@ class MainWindow(QMainWindow):
         
         # Clear existing widgets
         for widget in self.monitor_widgets:
+            widget.shutdown()
             widget.setParent(None)
         self.monitor_widgets.clear()
         
         # Start detection worker
-        self.detection_worker = MonitorDetectionWorker()
+        self.detection_worker = MonitorDetectionWorker(self.controller, refresh)
         self.detection_worker.monitors_detected.connect(self.on_monitors_detected)
         self.detection_worker.error_occurred.connect(self.on_detection_error)
         self.detection_worker.start()
     
-    def on_monitors_detected(self, monitors: List[Monitor]):
+    def on_monitors_detected(self, monitors: List[Monitor],
+                             values: List[Tuple[Optional[int], Optional[int]]]):
         """Handle successful monitor detection."""
         self.progress_bar.setVisible(False)
         self.monitors = monitors
@@ -322,9 +447,9 @@ class MainWindow(QMainWindow):
         
         self.status_label.setText(f"Found {len(monitors)} monitor(s)")
         
-        # Create control widgets for each monitor
-        for monitor in monitors:
-            widget = MonitorControlWidget(monitor, self.controller)
+        # Create control widgets for each monitor from the values read by the worker
+        for monitor, monitor_values in zip(monitors, values):
+            widget = MonitorControlWidget(monitor, self.controller, monitor_values)
             self.monitor_widgets.append(widget)
             self.monitors_layout.addWidget(widget)
     
@@ -360,7 +485,7 @@ def main():
         QMessageBox.critical(None, "Error", str(e))
         sys.exit(1)
     
-    window = MainWindow()
+    window = MainWindow(controller)
     window.show()
     
     sys.exit(app.exec())
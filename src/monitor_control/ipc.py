@@ -0,0 +1,50 @@
+"""Wire protocol shared by the DDC daemon and its clients.
+
+Messages are JSON objects preceded by a 4-byte big-endian length.
+"""
+
+import json
+import os
+import socket
+import struct
+from pathlib import Path
+from typing import Any, Dict
+
+
+HEADER = struct.Struct('!I')
+SOCKET_NAME = "monitor-control.sock"
+
+
+def socket_path() -> Path:
+    """Get the path of the daemon's Unix socket."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or f"/tmp/monitor-control-{os.getuid()}"
+    return Path(runtime_dir) / SOCKET_NAME
+
+
+def pack(message: Dict[str, Any]) -> bytes:
+    """Encode a message as a length-prefixed frame."""
+    body = json.dumps(message, separators=(',', ':')).encode()
+    return HEADER.pack(len(body)) + body
+
+
+def unpack(body: bytes) -> Dict[str, Any]:
+    """Decode the body of a frame."""
+    return json.loads(body)
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly ``size`` bytes from a blocking socket."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by daemon")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def request(sock: socket.socket, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one message over a blocking socket and wait for the reply."""
+    sock.sendall(pack(message))
+    (size,) = HEADER.unpack(recv_exactly(sock, HEADER.size))
+    return unpack(recv_exactly(sock, size))
@@ -0,0 +1,284 @@
+"""Optional ctypes bindings for libddcutil.
+
+Talking to libddcutil directly avoids forking ``ddcutil`` and re-parsing its
+text output for every VCP read or write. The library is optional: when it
+cannot be loaded, :func:`load` returns ``None`` and callers fall back to the
+``ddcutil`` command-line tool.
+"""
+
+import ctypes
+import ctypes.util
+from typing import Dict, List, Optional, Tuple
+
+
+_LIBRARY_NAMES = ("libddcutil.so.5", "libddcutil.so.4", "libddcutil.so")
+
+# Leading bytes of every valid DDCA_Display_Info record
+DDCA_DISPLAY_INFO_MARKER = b"DDIN"
+DDCA_IO_I2C = 0
+
+
+class DDCA_Non_Table_Vcp_Value(ctypes.Structure):
+    """Mirror of ``DDCA_Non_Table_Vcp_Value`` from ddcutil_types.h."""
+    _fields_ = [
+        ("mh", ctypes.c_ubyte),
+        ("ml", ctypes.c_ubyte),
+        ("sh", ctypes.c_ubyte),
+        ("sl", ctypes.c_ubyte),
+    ]
+
+
+class DDCA_Ddcutil_Version_Spec(ctypes.Structure):
+    """Mirror of ``DDCA_Ddcutil_Version_Spec`` from ddcutil_types.h."""
+    _fields_ = [
+        ("major", ctypes.c_ubyte),
+        ("minor", ctypes.c_ubyte),
+        ("micro", ctypes.c_ubyte),
+    ]
+
+
+class DDCA_IO_Path(ctypes.Structure):
+    """Mirror of ``DDCA_IO_Path``; the path union holds the I2C bus number."""
+    _fields_ = [
+        ("io_mode", ctypes.c_int),
+        ("path", ctypes.c_int),
+    ]
+
+
+class DDCA_Display_Info(ctypes.Structure):
+    """Mirror of ``DDCA_Display_Info`` from the libddcutil 2.x ddcutil_types.h."""
+    _fields_ = [
+        ("marker", ctypes.c_char * 4),
+        ("dispno", ctypes.c_int),
+        ("path", DDCA_IO_Path),
+        ("usb_bus", ctypes.c_int),
+        ("usb_device", ctypes.c_int),
+        ("mfg_id", ctypes.c_char * 4),
+        ("model_name", ctypes.c_char * 14),
+        ("sn", ctypes.c_char * 14),
+        ("product_code", ctypes.c_uint16),
+        ("edid_bytes", ctypes.c_ubyte * 128),
+        ("vcp_version", ctypes.c_ubyte * 2),
+        ("dref", ctypes.c_void_p),
+    ]
+
+
+class DDCA_Display_Info_List(ctypes.Structure):
+    """Header of ``DDCA_Display_Info_List``; ``ct`` records follow in ``info``."""
+    _fields_ = [
+        ("ct", ctypes.c_int),
+        ("info", DDCA_Display_Info * 0),
+    ]
+
+
+class LibDDCUtilError(Exception):
+    """Exception raised when a libddcutil call returns a non-zero status."""
+    pass
+
+
+class LibDDCUtil:
+    """Thin wrapper around the libddcutil C API with per-bus open handles."""
+
+    def __init__(self, lib: ctypes.CDLL):
+        self._lib = lib
+        self._handles: Dict[int, ctypes.c_void_p] = {}
+        # Display refs found by detect(), so opening a display needs no lookup
+        self._refs: Dict[int, ctypes.c_void_p] = {}
+        self._capabilities: Dict[int, str] = {}
+        self._bind()
+
+    def _bind(self) -> None:
+        """Declare argument and return types for the functions we use."""
+        lib = self._lib
+
+        lib.ddca_create_busno_display_identifier.argtypes = [
+            ctypes.c_int, ctypes.POINTER(ctypes.c_void_p)]
+        lib.ddca_create_busno_display_identifier.restype = ctypes.c_int
+
+        lib.ddca_free_display_identifier.argtypes = [ctypes.c_void_p]
+        lib.ddca_free_display_identifier.restype = ctypes.c_int
+
+        # libddcutil 2.x renamed ddca_create_display_ref to ddca_get_display_ref
+        get_ref = getattr(lib, 'ddca_get_display_ref', None) or lib.ddca_create_display_ref
+        get_ref.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)]
+        get_ref.restype = ctypes.c_int
+        self._get_display_ref = get_ref
+
+        lib.ddca_open_display2.argtypes = [
+            ctypes.c_void_p, ctypes.c_bool, ctypes.POINTER(ctypes.c_void_p)]
+        lib.ddca_open_display2.restype = ctypes.c_int
+
+        lib.ddca_close_display.argtypes = [ctypes.c_void_p]
+        lib.ddca_close_display.restype = ctypes.c_int
+
+        lib.ddca_get_non_table_vcp_value.argtypes = [
+            ctypes.c_void_p, ctypes.c_ubyte, ctypes.POINTER(DDCA_Non_Table_Vcp_Value)]
+        lib.ddca_get_non_table_vcp_value.restype = ctypes.c_int
+
+        lib.ddca_set_non_table_vcp_value.argtypes = [
+            ctypes.c_void_p, ctypes.c_ubyte, ctypes.c_ubyte, ctypes.c_ubyte]
+        lib.ddca_set_non_table_vcp_value.restype = ctypes.c_int
+
+        lib.ddca_get_capabilities_string.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)]
+        lib.ddca_get_capabilities_string.restype = ctypes.c_int
+
+        lib.ddca_ddcutil_version.argtypes = []
+        lib.ddca_ddcutil_version.restype = DDCA_Ddcutil_Version_Spec
+
+        lib.ddca_get_display_info_list2.argtypes = [
+            ctypes.c_bool, ctypes.POINTER(ctypes.POINTER(DDCA_Display_Info_List))]
+        lib.ddca_get_display_info_list2.restype = ctypes.c_int
+
+        lib.ddca_free_display_info_list.argtypes = [ctypes.POINTER(DDCA_Display_Info_List)]
+        lib.ddca_free_display_info_list.restype = None
+
+        # Only in libddcutil 2.x
+        self._redetect = getattr(lib, 'ddca_redetect_displays', None)
+        if self._redetect is not None:
+            self._redetect.argtypes = []
+            self._redetect.restype = ctypes.c_int
+
+    @staticmethod
+    def _check(status: int, what: str) -> None:
+        if status != 0:
+            raise LibDDCUtilError(f"{what} failed with status {status}")
+
+    def detect(self, refresh: bool = False) -> List[Tuple[int, str, str, str]]:
+        """List I2C displays as ``(bus, manufacturer, model, serial)`` tuples.
+
+        Uses the library's own display scan instead of ``ddcutil detect``;
+        ``refresh`` makes it scan again. Requires libddcutil 2.x, whose
+        display records this module mirrors.
+        """
+        version = self._lib.ddca_ddcutil_version()
+        if version.major < 2:
+            raise LibDDCUtilError(f"display listing needs libddcutil 2.x, found {version.major}.x")
+        if refresh and self._redetect is not None:
+            self._check(self._redetect(), "ddca_redetect_displays")
+
+        dlist = ctypes.POINTER(DDCA_Display_Info_List)()
+        self._check(self._lib.ddca_get_display_info_list2(False, ctypes.byref(dlist)),
+                    "ddca_get_display_info_list2")
+        try:
+            count = dlist.contents.ct
+            infos = (DDCA_Display_Info * count).from_address(
+                ctypes.addressof(dlist.contents) + DDCA_Display_Info_List.info.offset)
+            displays = []
+            refs = {}
+            for info in infos:
+                if info.marker != DDCA_DISPLAY_INFO_MARKER:
+                    raise LibDDCUtilError("unexpected DDCA_Display_Info layout")
+                if info.path.io_mode != DDCA_IO_I2C:
+                    continue
+                bus = info.path.path
+                refs[bus] = ctypes.c_void_p(info.dref)
+                displays.append((bus, _text(info.mfg_id), _text(info.model_name), _text(info.sn)))
+        finally:
+            self._lib.ddca_free_display_info_list(dlist)
+
+        self._refs = refs
+        return displays
+
+    def _handle(self, bus: int) -> ctypes.c_void_p:
+        """Return an open display handle for a bus, opening it on first use."""
+        handle = self._handles.get(bus)
+        if handle is not None:
+            return handle
+
+        dref = self._refs.get(bus)
+        if dref is None:
+            # Looking up a ref by bus makes libddcutil scan all displays first
+            did = ctypes.c_void_p()
+            self._check(self._lib.ddca_create_busno_display_identifier(bus, ctypes.byref(did)),
+                        "ddca_create_busno_display_identifier")
+            dref = ctypes.c_void_p()
+            try:
+                self._check(self._get_display_ref(did, ctypes.byref(dref)), "ddca_get_display_ref")
+            finally:
+                self._lib.ddca_free_display_identifier(did)
+        handle = ctypes.c_void_p()
+        self._check(self._lib.ddca_open_display2(dref, False, ctypes.byref(handle)),
+                    "ddca_open_display2")
+
+        self._handles[bus] = handle
+        return handle
+
+    def _drop(self, bus: int) -> None:
+        """Forget a bus's handle, ref and capabilities so the next call reopens it."""
+        handle = self._handles.pop(bus, None)
+        if handle is not None:
+            self._lib.ddca_close_display(handle)
+        self._capabilities.pop(bus, None)
+        self._refs.pop(bus, None)
+
+    def _call(self, bus: int, what: str, func, *args) -> None:
+        """Call a function on a bus's handle, dropping the handle if it fails."""
+        try:
+            self._check(func(self._handle(bus), *args), what)
+        except LibDDCUtilError:
+            # The display may have been unplugged or moved to another bus
+            self._drop(bus)
+            raise
+
+    def get_value(self, bus: int, code: int) -> Tuple[int, int]:
+        """Get current and maximum value for a non-table VCP feature."""
+        value = DDCA_Non_Table_Vcp_Value()
+        self._call(bus, "ddca_get_non_table_vcp_value", self._lib.ddca_get_non_table_vcp_value,
+                   code, ctypes.byref(value))
+        return decode_value(value)
+
+    def set_value(self, bus: int, code: int, value: int) -> None:
+        """Set a non-table VCP feature."""
+        self._call(bus, "ddca_set_non_table_vcp_value", self._lib.ddca_set_non_table_vcp_value,
+                   code, (value >> 8) & 0xFF, value & 0xFF)
+
+    def get_capabilities(self, bus: int) -> str:
+        """Get the raw capabilities string for a display, cached per bus."""
+        if bus in self._capabilities:
+            return self._capabilities[bus]
+
+        caps = ctypes.c_void_p()
+        self._call(bus, "ddca_get_capabilities_string", self._lib.ddca_get_capabilities_string,
+                   ctypes.byref(caps))
+        try:
+            result = ctypes.string_at(caps).decode('ascii', errors='replace')
+        finally:
+            libc_name = ctypes.util.find_library('c')
+            if libc_name:
+                ctypes.CDLL(libc_name).free(caps)
+
+        self._capabilities[bus] = result
+        return result
+
+    def close(self) -> None:
+        """Close all open display handles."""
+        for handle in self._handles.values():
+            self._lib.ddca_close_display(handle)
+        self._handles.clear()
+        self._capabilities.clear()
+        self._refs.clear()
+
+
+def _text(field: bytes) -> str:
+    return field.decode('ascii', errors='replace').strip()
+
+
+def decode_value(value: DDCA_Non_Table_Vcp_Value) -> Tuple[int, int]:
+    """Convert a raw VCP value record into ``(current, maximum)``."""
+    return (value.sh << 8) | value.sl, (value.mh << 8) | value.ml
+
+
+def load() -> Optional[LibDDCUtil]:
+    """Load libddcutil, returning ``None`` if it is not installed."""
+    names = list(_LIBRARY_NAMES)
+    found = ctypes.util.find_library('ddcutil')
+    if found:
+        names.append(found)
+
+    for name in names:
+        try:
+            return LibDDCUtil(ctypes.CDLL(name))
+        except (OSError, AttributeError):
+            continue
+    return None
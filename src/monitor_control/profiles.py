@@ -1,16 +1,53 @@
 """Profile management and keyboard shortcuts for monitor control."""
 
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import signal
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from pathlib import Path
 from pynput import keyboard
 from pynput.keyboard import Key, KeyCode
 import threading
 import time
 
-from .ddc import DDCController, Monitor, DDCError
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .ddc import BACKEND_BACKLIGHT, DDCController, DDCFeature, Monitor, DDCError, map_monitors
+
+
+# Minimum time between two firings of the same hotkey, in seconds
+HOTKEY_THROTTLE = 0.3
+
+# Named keys accepted in hotkey settings; single characters map to themselves
+_KEY_MAP = {
+    'ctrl': Key.ctrl_l,
+    'alt': Key.alt_l,
+    'shift': Key.shift_l,
+    'up': Key.up,
+    'down': Key.down,
+    'left': Key.left,
+    'right': Key.right,
+}
+
+# Keys that only qualify a hotkey; the remaining key triggers it
+MODIFIER_KEYS = frozenset({Key.ctrl_l, Key.alt_l, Key.shift_l})
+
+# How long brightness hotkey steps are collected before being written, in seconds
+BRIGHTNESS_FLUSH_DELAY = 0.15
+
+# Actions that step on every auto-repeated key press while their combo is held
+REPEATING_ACTIONS = frozenset({'brightness_up', 'brightness_down'})
+
+# How long re-applying the last applied profile is a no-op, in seconds
+APPLY_COOLDOWN = 5.0
+
+# How long detected monitors are reused by profiles and hotkeys, in seconds
+MONITOR_CACHE_TTL = 30.0
 
 
 @dataclass
@@ -33,7 +70,8 @@ class Profile:
 class ProfileManager:
     """Manages monitor profiles and settings."""
     
-    def __init__(self, config_dir: Optional[str] = None):
+    def __init__(self, config_dir: Optional[str] = None,
+                 controller: Optional[DDCController] = None):
         if config_dir is None:
             config_dir = os.path.join(os.path.expanduser("~"), ".config", "monitor-control")
         
@@ -42,12 +80,66 @@ class ProfileManager:
         self.profiles_file = self.config_dir / "profiles.json"
         self.settings_file = self.config_dir / "settings.json"
         
-        self.controller = DDCController()
-        self.profiles: Dict[str, Profile] = {}
-        self.settings: Dict[str, Any] = {}
-        
-        self.load_profiles()
-        self.load_settings()
+        # Loaded on first use so callers only pay for what they touch
+        self._controller = controller
+        self._profiles: Optional[Dict[str, Profile]] = None
+        self._settings: Optional[Dict[str, Any]] = None
+        self._monitors_cache: Optional[List[Monitor]] = None
+        self._monitors_cache_ts = 0.0
+        self._written: Dict[Path, str] = {}
+        # Per profile: the profile and monitor list a write plan was built from
+        self._apply_plans: Dict[str, Tuple[Profile, List[Monitor], List[Tuple[Monitor, MonitorSettings]]]] = {}
+        self._last_applied: Optional[Tuple[Profile, List[Monitor]]] = None
+        self._last_applied_ts = 0.0
+    
+    @property
+    def controller(self) -> DDCController:
+        """DDC controller, created on first use."""
+        if self._controller is None:
+            self._controller = DDCController()
+        return self._controller
+    
+    @controller.setter
+    def controller(self, controller: DDCController):
+        self._controller = controller
+    
+    @property
+    def profiles(self) -> Dict[str, Profile]:
+        """Profiles by name, loaded on first use."""
+        if self._profiles is None:
+            self.load_profiles()
+        return self._profiles
+    
+    @profiles.setter
+    def profiles(self, profiles: Dict[str, Profile]):
+        self._profiles = profiles
+    
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Application settings, loaded on first use."""
+        if self._settings is None:
+            self.load_settings()
+        return self._settings
+    
+    @settings.setter
+    def settings(self, settings: Dict[str, Any]):
+        self._settings = settings
+    
+    def get_monitors(self, ttl: float = MONITOR_CACHE_TTL) -> List[Monitor]:
+        """Get detected monitors, reusing a detection younger than ttl seconds."""
+        now = time.monotonic()
+        if self._monitors_cache is None or now - self._monitors_cache_ts > ttl:
+            try:
+                self._monitors_cache = self.controller.detect_monitors()
+            except DDCError:
+                self.invalidate_monitor_cache()
+                raise
+            self._monitors_cache_ts = now
+        return self._monitors_cache
+    
+    def invalidate_monitor_cache(self):
+        """Forget detected monitors, e.g. after resume or a hotplug."""
+        self._monitors_cache = None
     
     def load_profiles(self):
         """Load profiles from JSON file."""
@@ -56,8 +148,7 @@ class ProfileManager:
             return
         
         try:
-            with open(self.profiles_file, 'r') as f:
-                data = json.load(f)
+            data = self._read_json(self.profiles_file)
             
             self.profiles = {}
             for name, profile_data in data.items():
@@ -78,11 +169,10 @@ class ProfileManager:
             data[name] = {
                 'name': profile.name,
                 'description': profile.description,
-                'monitors': [asdict(m) for m in profile.monitors]
+                'monitors': profile.monitors
             }
         
-        with open(self.profiles_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self._write_json(self.profiles_file, data)
     
     def load_settings(self):
         """Load application settings."""
@@ -103,20 +193,43 @@ class ProfileManager:
             return
         
         try:
-            with open(self.settings_file, 'r') as f:
-                self.settings = json.load(f)
+            self.settings = self._read_json(self.settings_file)
         except json.JSONDecodeError:
             self.settings = {}
     
     def save_settings(self):
         """Save application settings."""
-        with open(self.settings_file, 'w') as f:
-            json.dump(self.settings, f, indent=2)
+        self._write_json(self.settings_file, self.settings)
+    
+    def _read_json(self, path: Path) -> Any:
+        """Read a JSON file in one read, remembering its contents for _write_json."""
+        payload = path.read_bytes()
+        data = orjson.loads(payload) if orjson is not None else json.loads(payload)
+        self._written[path] = hashlib.sha256(payload).hexdigest()
+        return data
+    
+    def _write_json(self, path: Path, data: Any):
+        """Atomically replace a JSON file, skipping the write if nothing changed."""
+        if orjson is not None:
+            # orjson serializes dataclasses natively
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2, default=vars).encode()
+        digest = hashlib.sha256(payload).hexdigest()
+        if self._written.get(path) == digest and path.exists():
+            return
+        
+        # Write beside the target and rename so a crash never leaves a truncated file
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        self._written[path] = digest
     
     def create_default_profiles(self):
         """Create default profiles."""
         try:
-            monitors = self.controller.detect_monitors()
+            monitors = self.get_monitors()
             
             # Day profile - bright settings
             day_monitors = []
@@ -174,16 +287,20 @@ class ProfileManager:
     def create_profile_from_current(self, name: str, description: str = "") -> bool:
         """Create a new profile from current monitor settings."""
         try:
-            monitors = self.controller.detect_monitors()
+            monitors = self.get_monitors()
             profile_monitors = []
             
             for monitor in monitors:
                 try:
                     brightness_current, brightness_max = self.controller.get_brightness(monitor)
-                    contrast_current, contrast_max = self.controller.get_contrast(monitor)
-                    
                     brightness_pct = round((brightness_current / brightness_max) * 100) if brightness_max > 0 else 50
-                    contrast_pct = round((contrast_current / contrast_max) * 100) if contrast_max > 0 else 50
+                    
+                    # Built-in panels have no contrast control
+                    if monitor.backend == BACKEND_BACKLIGHT:
+                        contrast_pct = 50
+                    else:
+                        contrast_current, contrast_max = self.controller.get_contrast(monitor)
+                        contrast_pct = round((contrast_current / contrast_max) * 100) if contrast_max > 0 else 50
                     
                     profile_monitors.append(MonitorSettings(
                         bus=monitor.bus,
@@ -192,6 +309,7 @@ class ProfileManager:
                         name=monitor.name
                     ))
                 except DDCError:
+                    self.invalidate_monitor_cache()
                     continue
             
             if profile_monitors:
@@ -214,29 +332,68 @@ class ProfileManager:
             return False
         
         profile = self.profiles[profile_name]
-        success = True
         
         try:
-            current_monitors = self.controller.detect_monitors()
-            monitor_map = {m.bus: m for m in current_monitors}
-            
-            for monitor_settings in profile.monitors:
-                if monitor_settings.bus not in monitor_map:
-                    continue
-                
-                monitor = monitor_map[monitor_settings.bus]
-                
-                try:
-                    self.controller.set_brightness(monitor, monitor_settings.brightness)
-                    self.controller.set_contrast(monitor, monitor_settings.contrast)
-                except DDCError:
-                    success = False
-                    continue
-            
+            current_monitors = self.get_monitors()
         except DDCError:
-            success = False
+            return False
+        
+        # A double-tapped hotkey finds the same profile on the same monitors
+        now = time.monotonic()
+        if (self._last_applied is not None and self._last_applied[0] is profile
+                and self._last_applied[1] is current_monitors
+                and now - self._last_applied_ts < APPLY_COOLDOWN):
+            return True
+        
+        targets = self._apply_plan(profile, current_monitors)
+        if not targets:
+            return True
+        
+        results = map_monitors(lambda target: self._apply_settings(*target), targets)
         
-        return success
+        if all(results):
+            self._last_applied = (profile, current_monitors)
+            self._last_applied_ts = now
+            return True
+        self._last_applied = None
+        return False
+    
+    def forget_applied_profile(self):
+        """Note that monitor settings changed outside apply_profile."""
+        self._last_applied = None
+    
+    def _apply_plan(self, profile: Profile,
+                    monitors: List[Monitor]) -> List[Tuple[Monitor, MonitorSettings]]:
+        """Pair a profile's settings with connected monitors, reusing the last pairing.
+        
+        A new detection or a replaced profile yields new objects, so matching
+        by identity is enough to know the plan is still valid.
+        """
+        cached = self._apply_plans.get(profile.name)
+        if cached is not None and cached[0] is profile and cached[1] is monitors:
+            return cached[2]
+        
+        monitor_map = {m.bus: m for m in monitors}
+        targets = [(monitor_map[monitor_settings.bus], monitor_settings)
+                   for monitor_settings in profile.monitors if monitor_settings.bus in monitor_map]
+        self._apply_plans[profile.name] = (profile, monitors, targets)
+        return targets
+    
+    def _apply_settings(self, monitor: Monitor, monitor_settings: MonitorSettings) -> bool:
+        """Apply profile settings to one monitor."""
+        try:
+            if monitor.backend == BACKEND_BACKLIGHT:
+                self.controller.set_brightness(monitor, monitor_settings.brightness)
+            else:
+                self.controller.set_values(monitor, [
+                    (DDCFeature.BRIGHTNESS, monitor_settings.brightness),
+                    (DDCFeature.CONTRAST, monitor_settings.contrast),
+                ])
+        except DDCError:
+            # The monitor may be gone; detect again next time
+            self.invalidate_monitor_cache()
+            return False
+        return True
     
     def delete_profile(self, profile_name: str) -> bool:
         """Delete a profile."""
@@ -261,8 +418,17 @@ class HotkeyManager:
     def __init__(self, profile_manager: ProfileManager):
         self.profile_manager = profile_manager
         self.listener: Optional[keyboard.Listener] = None
-        self.pressed_keys = set()
         self.hotkey_combinations = {}
+        # Pressed keys are tracked as bits; keys outside every combo are ignored
+        self._key_bit: Dict[Any, int] = {}
+        self._pressed_mask = 0
+        self._dispatch: Dict[Any, List[Tuple[int, str]]] = {}
+        self._active_mask = 0
+        self._last_fire_mask = 0
+        self._last_fire_ts = 0.0
+        self._pending_delta = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._flush_lock = threading.Lock()
         self.enabled = False
         self.load_hotkeys()
     
@@ -275,20 +441,29 @@ class HotkeyManager:
             if isinstance(key_combo, list):
                 keys = set()
                 for key_str in key_combo:
-                    if key_str.lower() == 'ctrl':
-                        keys.add(Key.ctrl_l)
-                    elif key_str.lower() == 'alt':
-                        keys.add(Key.alt_l)
-                    elif key_str.lower() == 'shift':
-                        keys.add(Key.shift_l)
-                    elif key_str.lower() == 'up':
-                        keys.add(Key.up)
-                    elif key_str.lower() == 'down':
-                        keys.add(Key.down)
+                    key_str = key_str.lower()
+                    key = _KEY_MAP.get(key_str)
+                    if key is not None:
+                        keys.add(key)
                     elif len(key_str) == 1:
-                        keys.add(KeyCode.from_char(key_str.lower()))
+                        keys.add(KeyCode.from_char(key_str))
                 
                 self.hotkey_combinations[frozenset(keys)] = action
+        
+        self._key_bit = {}
+        for combo in self.hotkey_combinations:
+            for key in combo:
+                self._key_bit.setdefault(key, 1 << len(self._key_bit))
+        
+        # Index combos by their trigger keys so most keystrokes need one dict lookup
+        self._dispatch = {}
+        for combo, action in self.hotkey_combinations.items():
+            mask = 0
+            for key in combo:
+                mask |= self._key_bit[key]
+            triggers = (combo - MODIFIER_KEYS) or combo
+            for trigger in triggers:
+                self._dispatch.setdefault(trigger, []).append((mask, action))
     
     def start(self):
         """Start listening for hotkeys."""
@@ -310,22 +485,58 @@ class HotkeyManager:
         if self.listener is not None:
             self.listener.stop()
             self.listener = None
-        self.pressed_keys.clear()
+        self._pressed_mask = 0
+        self._active_mask = 0
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending_delta = 0
     
     def on_key_press(self, key):
         """Handle key press events."""
-        self.pressed_keys.add(key)
+        bit = self._key_bit.get(key)
+        if bit is None:
+            return
+        self._pressed_mask |= bit
+        
+        candidates = self._dispatch.get(key)
+        if candidates is None:
+            return
+        
+        pressed = self._pressed_mask
+        matched = next(((mask, action) for mask, action in candidates
+                        if pressed & mask == mask), None)
+        if matched is None:
+            return
+        
+        mask, action = matched
+        if action in REPEATING_ACTIONS:
+            # Repeats are summed by _queue_brightness, so let every one through
+            self._active_mask = mask
+            self.execute_action(action)
+            return
         
-        # Check for hotkey combinations
-        for key_combo, action in self.hotkey_combinations.items():
-            if key_combo.issubset(self.pressed_keys):
-                self.execute_action(action)
-                # Small delay to prevent multiple triggers
-                time.sleep(0.1)
+        # Fire on the rising edge only; holding a combo auto-repeats key presses
+        if mask == self._active_mask:
+            return
+        self._active_mask = mask
+        
+        now = time.monotonic()
+        if mask == self._last_fire_mask and now - self._last_fire_ts <= HOTKEY_THROTTLE:
+            return
+        self._last_fire_mask = mask
+        self._last_fire_ts = now
+        self.execute_action(action)
     
     def on_key_release(self, key):
         """Handle key release events."""
-        self.pressed_keys.discard(key)
+        bit = self._key_bit.get(key)
+        if bit is None:
+            return
+        self._pressed_mask &= ~bit
+        if self._active_mask & bit:
+            self._active_mask = 0
     
     def execute_action(self, action: str):
         """Execute a hotkey action."""
@@ -336,25 +547,57 @@ class HotkeyManager:
         elif action == 'gaming_profile':
             self.profile_manager.apply_profile('gaming')
         elif action == 'brightness_up':
-            self.adjust_all_brightness(10)
+            self._queue_brightness(10)
         elif action == 'brightness_down':
-            self.adjust_all_brightness(-10)
+            self._queue_brightness(-10)
+    
+    def _queue_brightness(self, delta: int):
+        """Add a brightness step, writing the steps collected every BRIGHTNESS_FLUSH_DELAY."""
+        with self._flush_lock:
+            self._pending_delta += delta
+            if self._flush_timer is None:
+                self._arm_flush()
+    
+    def _arm_flush(self):
+        """Schedule a flush; called with _flush_lock held."""
+        self._flush_timer = threading.Timer(BRIGHTNESS_FLUSH_DELAY, self._flush_brightness)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    def _flush_brightness(self):
+        """Apply the brightness steps collected so far."""
+        with self._flush_lock:
+            delta, self._pending_delta = self._pending_delta, 0
+        if delta:
+            self.adjust_all_brightness(delta)
+        
+        # The timer stays set while writing so steps pressed meanwhile wait for the
+        # next flush instead of racing this read-modify-write
+        with self._flush_lock:
+            self._flush_timer = None
+            if self._pending_delta:
+                self._arm_flush()
     
     def adjust_all_brightness(self, delta: int):
         """Adjust brightness of all monitors by delta percentage."""
         try:
-            monitors = self.profile_manager.controller.detect_monitors()
-            
-            for monitor in monitors:
-                try:
-                    current, maximum = self.profile_manager.controller.get_brightness(monitor)
-                    current_pct = round((current / maximum) * 100) if maximum > 0 else 50
-                    new_pct = max(0, min(100, current_pct + delta))
-                    self.profile_manager.controller.set_brightness(monitor, new_pct)
-                except DDCError:
-                    continue
+            monitors = self.profile_manager.get_monitors()
         except DDCError:
-            pass
+            return
+        
+        map_monitors(lambda monitor: self._adjust_brightness(monitor, delta), monitors)
+    
+    def _adjust_brightness(self, monitor: Monitor, delta: int):
+        """Adjust brightness of one monitor by delta percentage."""
+        controller = self.profile_manager.controller
+        try:
+            current, maximum = controller.get_brightness(monitor)
+            current_pct = round((current / maximum) * 100) if maximum > 0 else 50
+            new_pct = max(0, min(100, current_pct + delta))
+            controller.set_brightness(monitor, new_pct)
+            self.profile_manager.forget_applied_profile()
+        except DDCError:
+            self.profile_manager.invalidate_monitor_cache()
 
 
 def start_background_service():
@@ -372,9 +615,9 @@ def start_background_service():
     hotkey_manager.start()
     
     try:
-        # Keep the service running
+        # Keep the service running without waking up periodically
         while True:
-            time.sleep(1)
+            signal.pause()
     except KeyboardInterrupt:
         hotkey_manager.stop()
 
@@ -1,8 +1,7 @@
 """Background service for monitor control."""
 
-import sys
 import signal
-import time
+import threading
 import argparse
 from pathlib import Path
 
@@ -17,6 +16,7 @@ class MonitorControlService:
         self.profile_manager = ProfileManager()
         self.hotkey_manager = HotkeyManager(self.profile_manager)
         self.running = False
+        self._stop_event = threading.Event()
     
     def start(self):
         """Start the service."""
@@ -52,9 +52,8 @@ class MonitorControlService:
         signal.signal(signal.SIGTERM, self.signal_handler)
         
         try:
-            # Keep the service running
-            while self.running:
-                time.sleep(1)
+            # Sleep until a signal asks us to stop
+            self._stop_event.wait()
         except KeyboardInterrupt:
             pass
         finally:
@@ -64,14 +63,15 @@ class MonitorControlService:
         """Stop the service."""
         print("\nStopping Monitor Control Service...")
         self.running = False
+        self._stop_event.set()
         self.hotkey_manager.stop()
         print("Service stopped")
     
     def signal_handler(self, signum, frame):
         """Handle system signals."""
         print(f"\nReceived signal {signum}")
-        self.stop()
-        sys.exit(0)
+        # start() wakes up and shuts down from the main flow
+        self._stop_event.set()
     
     def status(self):
         """Show service status."""
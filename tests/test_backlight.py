@@ -0,0 +1,122 @@
+"""Tests for built-in panel backlight control."""
+
+import io
+import pytest
+import subprocess
+from unittest.mock import patch, MagicMock
+
+from monitor_control.backlight import BacklightBackend, BacklightError
+from monitor_control.ddc import BACKEND_BACKLIGHT, DDCController, DDCError, DDCFeature
+
+
+@pytest.fixture
+def backlight_dir(tmp_path, monkeypatch):
+    """Fake /sys/class/backlight with one panel at 50% of 1000."""
+    base = tmp_path / "backlight"
+    device = base / "intel_backlight"
+    device.mkdir(parents=True)
+    (device / "brightness").write_text("500\n")
+    (device / "max_brightness").write_text("1000\n")
+    
+    monkeypatch.setattr('monitor_control.backlight.BACKLIGHT_DIR', base)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / "cache"))
+    return base
+
+
+class TestBacklightBackend:
+    """Test sysfs backlight access."""
+    
+    def test_list_and_read(self, backlight_dir):
+        """Test enumerating devices and reading brightness."""
+        backend = BacklightBackend()
+        
+        assert backend.list_devices() == ["intel_backlight"]
+        assert backend.get_brightness("intel_backlight") == (500, 1000)
+    
+    def test_one_interface_per_panel(self, backlight_dir):
+        """Test a panel exposed by firmware and raw interfaces is listed once."""
+        (backlight_dir / "intel_backlight" / "type").write_text("raw\n")
+        acpi = backlight_dir / "acpi_video0"
+        acpi.mkdir()
+        (acpi / "max_brightness").write_text("15\n")
+        (acpi / "type").write_text("firmware\n")
+        
+        assert BacklightBackend().list_devices() == ["acpi_video0"]
+    
+    def test_missing_directory(self, tmp_path):
+        """Test machines without a backlight report no devices."""
+        assert BacklightBackend(tmp_path / "missing").list_devices() == []
+    
+    def test_set_brightness_sysfs(self, backlight_dir):
+        """Test writing brightness directly to sysfs."""
+        BacklightBackend().set_brightness("intel_backlight", 250)
+        
+        assert (backlight_dir / "intel_backlight" / "brightness").read_text() == "250"
+    
+    @patch('subprocess.run')
+    def test_set_brightness_falls_back_to_logind(self, mock_run, backlight_dir):
+        """Test unprivileged writes go through logind."""
+        with patch('pathlib.Path.write_text', side_effect=PermissionError()):
+            BacklightBackend().set_brightness("intel_backlight", 250)
+        
+        cmd = mock_run.call_args[0][0]
+        assert cmd[:2] == ['busctl', 'call']
+        assert cmd[-3:] == ['backlight', 'intel_backlight', '250']
+    
+    @patch('subprocess.run')
+    def test_logind_failure(self, mock_run, backlight_dir):
+        """Test logind failures raise BacklightError."""
+        mock_run.side_effect = subprocess.CalledProcessError(1, 'busctl')
+        with patch('pathlib.Path.write_text', side_effect=PermissionError()):
+            with pytest.raises(BacklightError):
+                BacklightBackend().set_brightness("intel_backlight", 250)
+
+
+class TestControllerBacklight:
+    """Test DDCController dispatching built-in panels to the backlight."""
+    
+    @pytest.fixture
+    def controller(self, backlight_dir):
+        with patch('monitor_control.ddc.libddcutil.load', return_value=None), \
+             patch('monitor_control.ddc.shutil.which', return_value='/usr/bin/ddcutil'), \
+             patch('monitor_control.ddc._edid_fingerprint', return_value=None):
+            yield DDCController()
+    
+    @patch('subprocess.Popen')
+    def test_panel_detected_without_ddc(self, mock_popen, controller):
+        """Test the built-in panel is listed even when ddcutil detect fails."""
+        proc = MagicMock()
+        proc.stdout = io.StringIO("")
+        proc.stderr = io.StringIO("i2c-dev not loaded")
+        proc.wait.return_value = 1
+        mock_popen.return_value = proc
+        
+        monitors = controller.detect_monitors()
+        
+        assert len(monitors) == 1
+        assert monitors[0].backend == BACKEND_BACKLIGHT
+        assert monitors[0].bus == -1
+        assert monitors[0].device == "intel_backlight"
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_panel_brightness(self, mock_run, controller, backlight_dir):
+        """Test brightness reads are raw and writes are percentages."""
+        panel = controller._detect_backlight_panels()[0]
+        
+        assert controller.get_brightness(panel) == (500, 1000)
+        controller.set_brightness(panel, 30)
+        assert (backlight_dir / "intel_backlight" / "brightness").read_text() == "300"
+        
+        # Low percentages still leave the backlight on
+        controller.set_brightness(panel, 0)
+        assert (backlight_dir / "intel_backlight" / "brightness").read_text() == "1"
+        
+        assert controller.get_supported_features(panel) == [DDCFeature.BRIGHTNESS]
+        with pytest.raises(DDCError, match="not supported"):
+            controller.set_contrast(panel, 50)
+        mock_run.assert_not_called()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,268 @@
+"""Tests for the DDC daemon and its client."""
+
+import asyncio
+import io
+import os
+import socket
+import stat
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+from monitor_control import ipc
+from monitor_control.daemon import DDCDaemon
+from monitor_control.ddc import (
+    DAEMON_REPLY_MARGIN, DAEMON_RETRY_INTERVAL, DETECT_CACHE_TTL, DETECT_TIMEOUT, DDCController, DDCError, Monitor, DDCFeature)
+
+
+TEST_MONITOR = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    """Point the daemon socket at a temporary runtime directory."""
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / "cache"))
+    monkeypatch.setattr('monitor_control.backlight.BACKLIGHT_DIR', tmp_path / "backlight")
+    with patch('monitor_control.ddc.libddcutil.load', return_value=None), \
+         patch('monitor_control.ddc.shutil.which', return_value='/usr/bin/ddcutil'), \
+         patch('monitor_control.ddc._ddcutil_version', return_value=(2, 1)):
+        yield tmp_path
+
+
+@pytest.fixture
+def daemon():
+    """Daemon backed by a mock controller with one monitor."""
+    controller = MagicMock()
+    controller.detect_monitors.return_value = [TEST_MONITOR]
+    controller.get_value.return_value = (40, 100)
+    return DDCDaemon(controller)
+
+
+class TestDDCDaemon:
+    """Test request dispatch in the daemon."""
+    
+    @patch('subprocess.Popen')
+    def test_detect_follows_edid_changes(self, mock_popen, runtime_dir):
+        """Test that detection is reused until the connected EDIDs change."""
+        outputs = {
+            'abc': "Display 1\n   I2C bus:  /dev/i2c-4\n",
+            'def': "Display 1\n   I2C bus:  /dev/i2c-6\n",
+        }
+        fingerprint = ['abc']
+        clock = [100.0]
+        
+        def popen(*args, **kwargs):
+            proc = MagicMock()
+            proc.stdout = io.StringIO(outputs[fingerprint[0]])
+            proc.stderr = io.StringIO("")
+            proc.wait.return_value = 0
+            return proc
+        
+        mock_popen.side_effect = popen
+        daemon = DDCDaemon(DDCController(use_daemon=False))
+        
+        with patch('monitor_control.ddc._edid_fingerprint', side_effect=lambda: fingerprint[0]), \
+             patch('monitor_control.ddc.time.monotonic', side_effect=lambda: clock[0]):
+            assert [m['bus'] for m in daemon.handle({'op': 'detect'})['result']] == [4]
+            daemon.handle({'op': 'detect'})
+            assert mock_popen.call_count == 1
+            
+            # A monitor moved to another bus is picked up without an explicit refresh
+            fingerprint[0] = 'def'
+            clock[0] += DETECT_CACHE_TTL
+            assert [m['bus'] for m in daemon.handle({'op': 'detect'})['result']] == [6]
+            assert mock_popen.call_count == 2
+    
+    def test_getvcp_and_setvcp(self, daemon):
+        """Test VCP reads and writes are forwarded to the controller."""
+        reply = daemon.handle({'op': 'getvcp', 'bus': 4, 'code': 0x10})
+        assert reply == {'ok': True, 'result': [40, 100]}
+        
+        reply = daemon.handle({'op': 'setvcp', 'bus': 4, 'code': 0x12, 'value': 70})
+        assert reply['ok']
+        daemon.controller.set_value.assert_called_once_with(TEST_MONITOR, DDCFeature.CONTRAST, 70)
+        
+        reply = daemon.handle({'op': 'setvcps', 'bus': 4, 'values': [[0x10, 50], [0x12, 70]]})
+        assert reply['ok']
+        daemon.controller.set_values.assert_called_once_with(
+            TEST_MONITOR, [(DDCFeature.BRIGHTNESS, 50), (DDCFeature.CONTRAST, 70)])
+    
+    def test_errors_are_reported(self, daemon):
+        """Test unknown buses and operations produce error replies."""
+        daemon.controller.detect_monitors.return_value = []
+        
+        assert not daemon.handle({'op': 'getvcp', 'bus': 9, 'code': 0x10})['ok']
+        assert not daemon.handle({'op': 'bogus'})['ok']
+
+
+class TestDaemonClient:
+    """Test DDCController talking to a running daemon."""
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_round_trip(self, mock_run, runtime_dir, daemon):
+        """Test that a controller uses the daemon when its socket exists."""
+        mock_run.return_value = MagicMock(returncode=0)
+        controller = DDCController()
+        mock_run.reset_mock()
+        
+        def client_calls():
+            try:
+                monitors = controller.detect_monitors()
+                controller.set_brightness(monitors[0], 55)
+                return monitors, controller.get_brightness(monitors[0])
+            finally:
+                controller.close()
+        
+        async def run():
+            server = asyncio.ensure_future(daemon.serve(ipc.socket_path()))
+            while not ipc.socket_path().exists():
+                await asyncio.sleep(0.01)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, client_calls)
+            finally:
+                server.cancel()
+        
+        monitors, brightness = asyncio.run(run())
+        
+        assert monitors == [TEST_MONITOR]
+        assert brightness == (40, 100)
+        daemon.controller.set_value.assert_called_once_with(TEST_MONITOR, DDCFeature.BRIGHTNESS, 55)
+        mock_run.assert_not_called()
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_error_reply_raises(self, mock_run, runtime_dir):
+        """Test that daemon error replies surface as DDCError."""
+        mock_run.return_value = MagicMock(returncode=0)
+        controller = DDCController()
+        controller._socket = MagicMock()
+        
+        with patch('monitor_control.ddc.ipc.request', return_value={'ok': False, 'error': 'boom'}):
+            with pytest.raises(DDCError, match="boom"):
+                controller.set_brightness(TEST_MONITOR, 10)
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_falls_back_without_daemon(self, mock_run, runtime_dir):
+        """Test that the subprocess backend is used when no daemon is running."""
+        mock_run.return_value = MagicMock(returncode=0)
+        controller = DDCController()
+        
+        controller.set_brightness(TEST_MONITOR, 75)
+        
+        assert mock_run.call_args[0][0][:2] == ['/usr/bin/ddcutil', '--bus=4']
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_hung_daemon_falls_back(self, mock_run, runtime_dir):
+        """Test that a daemon that stops answering is treated as not running."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="")
+        controller = DDCController()
+        sock = MagicMock()
+        controller._socket = sock
+        
+        with patch('monitor_control.ddc.ipc.request', side_effect=socket.timeout):
+            controller.get_supported_features(TEST_MONITOR)
+        
+        sock.settimeout.assert_called_with(DETECT_TIMEOUT + DAEMON_REPLY_MARGIN)
+        sock.close.assert_called_once()
+        assert mock_run.call_args[0][0][:3] == ['/usr/bin/ddcutil', '--bus=4', 'capabilities']
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_daemon_retried_after_backoff(self, mock_run, runtime_dir):
+        """Test that a client goes back to the daemon once the retry interval has passed."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="VCP code 0x10 (Brightness): current value = 50, max value = 100")
+        controller = DDCController()
+        clock = [100.0]
+        replies = [socket.timeout, {'ok': True, 'result': [40, 100]}]
+        
+        with patch('monitor_control.ddc.socket.socket'), \
+             patch('monitor_control.ddc.ipc.request', side_effect=replies) as mock_request, \
+             patch('monitor_control.ddc.time.monotonic', side_effect=lambda: clock[0]):
+            assert controller.get_brightness(TEST_MONITOR) == (50, 100)
+            controller._values.clear()
+            assert controller.get_brightness(TEST_MONITOR) == (50, 100)
+            assert mock_request.call_count == 1
+            
+            clock[0] += DAEMON_RETRY_INTERVAL
+            assert controller.get_brightness(TEST_MONITOR) == (40, 100)
+            assert mock_request.call_count == 2
+
+
+class TestDaemonSocket:
+    """Test where and how the daemon creates its socket."""
+    
+    def test_socket_is_private(self, tmp_path, daemon):
+        """Test that the socket directory and socket are owner-only."""
+        path = tmp_path / "run" / "daemon.sock"
+        
+        async def run():
+            server = asyncio.ensure_future(daemon.serve(path))
+            while not path.exists():
+                await asyncio.sleep(0.01)
+            try:
+                return os.stat(path.parent).st_mode, os.stat(path).st_mode
+            finally:
+                server.cancel()
+        
+        dir_mode, sock_mode = asyncio.run(run())
+        assert stat.S_IMODE(dir_mode) == 0o700
+        assert stat.S_IMODE(sock_mode) == 0o600
+    
+    def test_live_daemon_not_replaced(self, tmp_path, daemon):
+        """Test that a second daemon refuses to take over a socket that is in use."""
+        path = tmp_path / "daemon.sock"
+        
+        async def run():
+            server = asyncio.ensure_future(daemon.serve(path))
+            while not path.exists():
+                await asyncio.sleep(0.01)
+            try:
+                with pytest.raises(DDCError, match="already listening"):
+                    await DDCDaemon(MagicMock()).serve(path)
+            finally:
+                server.cancel()
+        
+        asyncio.run(run())
+    
+    def test_slow_bus_does_not_block_others(self, tmp_path, daemon):
+        """Test that a slow request on one bus doesn't hold up requests for another."""
+        other = Monitor(bus=6, name="Other", manufacturer="TEST", model="MODEL")
+        daemon.controller.detect_monitors.return_value = [TEST_MONITOR, other]
+        release = threading.Event()
+        daemon.controller.get_supported_features.side_effect = lambda monitor: release.wait(5) and []
+        path = tmp_path / "daemon.sock"
+        
+        def call(message):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(path))
+                return ipc.request(sock, message)
+        
+        async def run():
+            server = asyncio.ensure_future(daemon.serve(path))
+            while not path.exists():
+                await asyncio.sleep(0.01)
+            loop = asyncio.get_running_loop()
+            try:
+                slow = loop.run_in_executor(None, call, {'op': 'capabilities', 'bus': 4})
+                fast = await loop.run_in_executor(None, call, {'op': 'getvcp', 'bus': 6, 'code': 0x10})
+                finished_first = not slow.done()
+                release.set()
+                await slow
+                return fast, finished_first
+            finally:
+                release.set()
+                server.cancel()
+        
+        fast, finished_first = asyncio.run(run())
+        assert fast == {'ok': True, 'result': [40, 100]}
+        assert finished_first
+    
+    def test_foreign_directory_refused(self, tmp_path, daemon):
+        """Test that a socket directory owned by someone else is not used."""
+        with patch('monitor_control.daemon.os.getuid', return_value=os.getuid() + 1):
+            with pytest.raises(DDCError, match="Refusing"):
+                asyncio.run(daemon.serve(tmp_path / "daemon.sock"))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -1,34 +1,69 @@
 """Tests for DDC/CI functionality."""
 
+import ctypes
 import pytest
 from unittest.mock import patch, MagicMock
+import io
+import os
 import subprocess
+import sys
 
-from monitor_control.ddc import DDCController, DDCError, Monitor, DDCFeature
+from monitor_control.ddc import (
+    DDCController, DDCError, Monitor, DDCFeature, VALUE_MEMORY_TTL, _ddcutil_version, _edid_fingerprint)
+from monitor_control.libddcutil import (
+    DDCA_DISPLAY_INFO_MARKER, DDCA_IO_I2C, DDCA_Ddcutil_Version_Spec, DDCA_Display_Info,
+    DDCA_Display_Info_List, DDCA_Non_Table_Vcp_Value, LibDDCUtil, LibDDCUtilError, decode_value)
+
+
+@pytest.fixture(autouse=True)
+def isolated_ddc(tmp_path, monkeypatch):
+    """Isolate the controller from the host's daemon, caches, sysfs and libddcutil.
+    
+    The daemon socket and cache directory point into tmp_path, there are no
+    backlights or EDIDs, and ddcutil is a fake 2.1 at /usr/bin/ddcutil driven
+    through the subprocess backend.
+    """
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / "cache"))
+    monkeypatch.setattr('monitor_control.backlight.BACKLIGHT_DIR', tmp_path / "backlight")
+    with patch('monitor_control.ddc.libddcutil.load', return_value=None), \
+         patch('monitor_control.ddc._edid_fingerprint', return_value=None), \
+         patch('monitor_control.ddc.shutil.which', return_value='/usr/bin/ddcutil'), \
+         patch('monitor_control.ddc._ddcutil_version', return_value=(2, 1)):
+        yield
+
+
+def popen_result(stdout, returncode=0, stderr=""):
+    """Build a mock Popen process streaming the given output."""
+    proc = MagicMock()
+    proc.__enter__.return_value = proc
+    proc.stdout = io.StringIO(stdout)
+    proc.stderr = io.StringIO(stderr)
+    proc.wait.return_value = returncode
+    return proc
 
 
 class TestDDCController:
     """Test DDC controller functionality."""
     
-    @patch('subprocess.run')
+    @patch('monitor_control.ddc.DDCController._run')
     def test_check_ddcutil_success(self, mock_run):
         """Test ddcutil check when available."""
         mock_run.return_value = MagicMock(returncode=0)
         controller = DDCController()
         assert controller is not None
     
-    @patch('subprocess.run')
+    @patch('monitor_control.ddc.DDCController._run')
     def test_check_ddcutil_not_found(self, mock_run):
         """Test ddcutil check when not available."""
-        mock_run.side_effect = FileNotFoundError()
-        with pytest.raises(DDCError, match="ddcutil not found"):
-            DDCController()
+        with patch('monitor_control.ddc.shutil.which', return_value=None):
+            with pytest.raises(DDCError, match="ddcutil not found"):
+                DDCController()
+        mock_run.assert_not_called()
     
-    @patch('subprocess.run')
-    def test_detect_monitors_success(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_detect_monitors_success(self, mock_popen):
         """Test successful monitor detection."""
-        # Mock ddcutil check
-        mock_run.return_value = MagicMock(returncode=0)
         controller = DDCController()
         
         # Mock detect output
@@ -51,8 +86,7 @@ Display 2
       Product code:         5678
       Serial number:        XYZ789
 """
-        mock_run.return_value.stdout = detect_output
-        mock_run.return_value.returncode = 0
+        mock_popen.return_value = popen_result(detect_output)
         
         monitors = controller.detect_monitors()
         
@@ -67,21 +101,157 @@ Display 2
         assert monitors[1].manufacturer == "DEL"
         assert monitors[1].serial == "XYZ789"
     
-    @patch('subprocess.run')
-    def test_detect_monitors_empty(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_detect_monitors_empty(self, mock_popen):
         """Test monitor detection with no monitors."""
-        # Mock ddcutil check
-        mock_run.return_value = MagicMock(returncode=0)
         controller = DDCController()
         
         # Mock empty detect output
-        mock_run.return_value.stdout = "No displays detected"
-        mock_run.return_value.returncode = 0
+        mock_popen.return_value = popen_result("No displays detected")
         
         monitors = controller.detect_monitors()
         assert len(monitors) == 0
     
-    @patch('subprocess.run')
+    @patch('subprocess.Popen')
+    def test_detect_monitors_failure(self, mock_popen):
+        """Test monitor detection when ddcutil exits with an error."""
+        controller = DDCController()
+        
+        mock_popen.return_value = popen_result("", returncode=1, stderr="i2c-dev not loaded")
+        
+        with pytest.raises(DDCError, match="i2c-dev not loaded"):
+            controller.detect_monitors()
+    
+    def test_detect_survives_verbose_stderr(self, tmp_path):
+        """Test detection doesn't stall when ddcutil writes more stderr than a pipe holds."""
+        script = tmp_path / "ddcutil"
+        script.write_text(f"""#!{sys.executable}
+import sys
+sys.stderr.write("x" * 1_000_000)
+print("Display 1")
+print("   I2C bus:  /dev/i2c-4")
+""")
+        script.chmod(0o755)
+        controller = DDCController()
+        controller._ddcutil = str(script)
+        
+        assert [m.bus for m in controller.detect_monitors()] == [4]
+    
+    @patch('subprocess.Popen')
+    def test_detect_gives_up_on_stuck_ddcutil(self, mock_popen):
+        """Test detection times out even if a killed ddcutil never closes its output."""
+        read_fd, write_fd = os.pipe()
+        proc = mock_popen.return_value
+        proc.stdout = open(read_fd)
+        proc.stderr = io.StringIO("")
+        proc.wait.side_effect = subprocess.TimeoutExpired(['ddcutil', 'detect'], 1)
+        controller = DDCController()
+        
+        try:
+            with patch('monitor_control.ddc.DETECT_TIMEOUT', 0.2):
+                with pytest.raises(DDCError, match="timed out"):
+                    controller.detect_monitors()
+            proc.kill.assert_called_once()
+        finally:
+            os.close(write_fd)
+    
+    @patch('subprocess.Popen')
+    def test_get_monitor_by_bus(self, mock_popen):
+        """Test looking up detected monitors by bus number."""
+        controller = DDCController()
+        mock_popen.return_value = popen_result("""
+Display 1
+   I2C bus:  /dev/i2c-4
+   Monitor:  LG HDR 4K
+""")
+        
+        assert controller.get_monitor(4).name == "LG HDR 4K"
+        assert controller.get_monitor(7) is None
+        assert mock_popen.call_count == 1
+    
+    @patch('monitor_control.ddc._edid_fingerprint', return_value="abc")
+    @patch('subprocess.Popen')
+    def test_detect_monitors_cached(self, mock_popen, mock_fingerprint):
+        """Test detection results are reused while EDIDs are unchanged."""
+        controller = DDCController()
+        
+        detect_output = """
+Display 1
+   I2C bus:  /dev/i2c-4
+   Monitor:  LG HDR 4K
+"""
+        mock_popen.side_effect = lambda *args, **kwargs: popen_result(detect_output)
+        first = controller.detect_monitors()
+        mock_popen.reset_mock()
+        
+        # A new controller (e.g. the next CLI invocation) reads the disk cache
+        assert DDCController().detect_monitors() == first
+        mock_popen.assert_not_called()
+        
+        # A different EDID set invalidates the cache
+        mock_fingerprint.return_value = "def"
+        DDCController().detect_monitors()
+        assert mock_popen.call_count == 1
+        
+        # So does an explicit refresh
+        controller.detect_monitors(refresh=True)
+        assert mock_popen.call_count == 2
+    
+    @patch('monitor_control.ddc._edid_fingerprint', return_value="abc")
+    @patch('monitor_control.ddc.DDCController._run')
+    @patch('subprocess.Popen')
+    def test_failing_cached_bus_drops_cache(self, mock_popen, mock_run, mock_fingerprint):
+        """Test a cached monitor that stops answering forces a new detection."""
+        mock_popen.side_effect = lambda *args, **kwargs: popen_result("""
+Display 1
+   I2C bus:  /dev/i2c-4
+   Monitor:  LG HDR 4K
+""")
+        DDCController().detect_monitors()
+        mock_popen.reset_mock()
+        
+        controller = DDCController()
+        monitor = controller.detect_monitors()[0]
+        mock_popen.assert_not_called()
+        
+        mock_run.side_effect = subprocess.CalledProcessError(1, 'ddcutil', stderr="No monitor on bus 4")
+        with pytest.raises(DDCError):
+            controller.set_brightness(monitor, 50)
+        
+        controller.detect_monitors()
+        assert mock_popen.call_count == 1
+    
+    def test_fingerprint_includes_buses(self, tmp_path, monkeypatch):
+        """Test the same EDID moved to another I2C bus changes the fingerprint."""
+        connector = tmp_path / "card0-HDMI-A-1"
+        connector.mkdir()
+        (connector / "edid").write_bytes(b"\x00\xff\xff")
+        (connector / "i2c-4").mkdir()
+        monkeypatch.setattr('monitor_control.ddc.DRM_DIR', tmp_path)
+        first = _edid_fingerprint()
+        
+        (connector / "i2c-4").rename(connector / "i2c-5")
+        assert _edid_fingerprint() != first
+    
+    @patch('subprocess.Popen')
+    def test_detect_monitors_memory_cache(self, mock_popen):
+        """Test repeated detection on one controller is reused for a short time."""
+        controller = DDCController()
+        mock_popen.side_effect = lambda *args, **kwargs: popen_result("""
+Display 1
+   I2C bus:  /dev/i2c-4
+""")
+        
+        with patch('monitor_control.ddc.time.monotonic', return_value=100.0):
+            controller.detect_monitors()
+            controller.detect_monitors()
+        assert mock_popen.call_count == 1
+        
+        with patch('monitor_control.ddc.time.monotonic', return_value=105.0):
+            controller.detect_monitors()
+        assert mock_popen.call_count == 2
+    
+    @patch('monitor_control.ddc.DDCController._run')
     def test_get_brightness_success(self, mock_run):
         """Test getting brightness value."""
         # Mock ddcutil check
@@ -99,7 +269,7 @@ Display 2
         assert current == 80
         assert maximum == 100
     
-    @patch('subprocess.run')
+    @patch('monitor_control.ddc.DDCController._run')
     def test_set_brightness_success(self, mock_run):
         """Test setting brightness value."""
         # Mock ddcutil check
@@ -114,11 +284,163 @@ Display 2
         
         # Verify correct command was called
         mock_run.assert_called_with(
-            ['ddcutil', '--bus=4', 'setvcp', '10', '75'],
-            capture_output=True, text=True, check=True
-        )
+            ['/usr/bin/ddcutil', '--bus=4', '--skip-ddc-checks', '--sleep-multiplier=0.1', '--noverify',
+             'setvcp', '10', '75'])
     
-    @patch('subprocess.run')
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_skip_ddc_checks_needs_ddcutil_2(self, mock_run):
+        """Test --skip-ddc-checks is left out for ddcutil 1.x, which rejects it."""
+        mock_run.return_value = MagicMock(returncode=0)
+        controller = DDCController()
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        with patch('monitor_control.ddc._ddcutil_version', return_value=(1, 4)):
+            controller.set_brightness(monitor, 75)
+        
+        assert '--skip-ddc-checks' not in mock_run.call_args[0][0]
+    
+    def test_ddcutil_version_cached_on_disk(self, tmp_path):
+        """Test ddcutil --version runs once per executable until it changes."""
+        ddcutil = tmp_path / "ddcutil"
+        ddcutil.write_text("#!/bin/sh\necho 'ddcutil 1.4.1'\n")
+        ddcutil.chmod(0o755)
+        read_version = _ddcutil_version.__wrapped__
+        
+        assert read_version(str(ddcutil)) == (1, 4)
+        with patch('subprocess.run') as mock_run:
+            assert read_version(str(ddcutil)) == (1, 4)
+            mock_run.assert_not_called()
+        
+        # An upgrade replaces the executable and is noticed by its mtime
+        ddcutil.write_text("#!/bin/sh\necho 'ddcutil 2.1.4'\n")
+        os.utime(ddcutil, ns=(0, 1))
+        assert read_version(str(ddcutil)) == (2, 1)
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_set_values_single_call(self, mock_run):
+        """Test several features are written with one ddcutil call."""
+        controller = DDCController()
+        mock_run.return_value = MagicMock(returncode=0)
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        controller.set_values(monitor, [(DDCFeature.BRIGHTNESS, 75), (DDCFeature.CONTRAST, 60)])
+        
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][-5:] == ['setvcp', '10', '75', '12', '60']
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_set_values_per_pair_on_ddcutil_1(self, mock_run):
+        """Test ddcutil 1.x gets one setvcp per feature without trying a combined call."""
+        controller = DDCController()
+        mock_run.return_value = MagicMock(returncode=0)
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        with patch('monitor_control.ddc._ddcutil_version', return_value=(1, 4)):
+            controller.set_values(monitor, [(DDCFeature.BRIGHTNESS, 75), (DDCFeature.CONTRAST, 60)])
+        
+        assert [c.args[0][-3:] for c in mock_run.call_args_list] == \
+            [['setvcp', '10', '75'], ['setvcp', '12', '60']]
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_set_values_failure_not_retried(self, mock_run):
+        """Test a failed combined setvcp raises instead of retrying each pair."""
+        controller = DDCController()
+        mock_run.side_effect = subprocess.CalledProcessError(1, 'ddcutil', stderr="bus busy")
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        with pytest.raises(DDCError, match="bus busy"):
+            controller.set_values(monitor, [(DDCFeature.BRIGHTNESS, 75), (DDCFeature.CONTRAST, 60)])
+        mock_run.assert_called_once()
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_set_unchanged_value_skipped(self, mock_run):
+        """Test writing the value a monitor already holds runs no command."""
+        controller = DDCController()
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="VCP code 0x10 (Brightness): current value = 75, max value = 100")
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        
+        controller.get_brightness(monitor)
+        controller.set_brightness(monitor, 75)
+        assert mock_run.call_count == 1
+        
+        controller.set_brightness(monitor, 60)
+        controller.set_brightness(monitor, 60)
+        assert mock_run.call_count == 2
+        
+        controller.set_values(monitor, [(DDCFeature.BRIGHTNESS, 60), (DDCFeature.CONTRAST, 50)])
+        assert mock_run.call_args[0][0][-3:] == ['setvcp', '12', '50']
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_reapply_after_external_change_writes(self, mock_run):
+        """Test remembered values expire so changes made elsewhere get overwritten."""
+        controller = DDCController()
+        mock_run.return_value = MagicMock(returncode=0)
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        profile = [(DDCFeature.BRIGHTNESS, 80), (DDCFeature.CONTRAST, 75)]
+        clock = [100.0]
+        
+        with patch('monitor_control.ddc.time.monotonic', side_effect=lambda: clock[0]), \
+             patch('monitor_control.ddc.time.sleep'):
+            controller.set_values(monitor, profile)
+            assert mock_run.call_count == 1
+            
+            # The user dims the monitor from its menu or another process, then
+            # re-applies the profile once the memory has expired
+            clock[0] += VALUE_MEMORY_TTL
+            controller.set_values(monitor, profile)
+        
+        assert mock_run.call_count == 2
+        assert mock_run.call_args[0][0][-5:] == ['setvcp', '10', '80', '12', '75']
+    
+    @patch('subprocess.Popen')
+    def test_set_brightness_timeout(self, mock_popen):
+        """Test that a hung ddcutil call raises DDCError even if it can't be reaped."""
+        controller = DDCController()
+        proc = mock_popen.return_value
+        proc.communicate.side_effect = subprocess.TimeoutExpired(['ddcutil', 'setvcp'], 5)
+        proc.wait.side_effect = subprocess.TimeoutExpired(['ddcutil', 'setvcp'], 1)
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        with pytest.raises(DDCError, match="timed out"):
+            controller.set_brightness(monitor, 75)
+        proc.kill.assert_called_once()
+        proc.wait.assert_called_once_with(timeout=1)
+    
+    def test_run_reports_failures(self):
+        """Test that a failing command raises CalledProcessError with its output."""
+        controller = DDCController()
+        with pytest.raises(subprocess.CalledProcessError) as excinfo:
+            controller._run([sys.executable, '-c', 'import sys; sys.exit("no monitor")'])
+        assert excinfo.value.stderr.strip() == "no monitor"
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_operations_on_bus_are_spaced(self, mock_run):
+        """Test back-to-back operations on one bus are rate limited."""
+        controller = DDCController()
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        
+        with patch('monitor_control.ddc.time.sleep') as mock_sleep:
+            controller.set_brightness(monitor, 10)
+            mock_sleep.assert_not_called()
+            controller.set_brightness(monitor, 20)
+            assert 0 < mock_sleep.call_args[0][0] <= 0.1
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_sleep_multiplier_from_environment(self, mock_run, monkeypatch):
+        """Test the ddcutil sleep multiplier can be overridden."""
+        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value.stdout = "VCP code 0x10 (Brightness): current value = 80, max value = 100"
+        monkeypatch.setenv('MONITOR_CONTROL_SLEEP_MULT', '0.5')
+        controller = DDCController()
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        controller.get_brightness(monitor)
+        
+        assert mock_run.call_args[0][0] == [
+            '/usr/bin/ddcutil', '--bus=4', '--skip-ddc-checks', '--sleep-multiplier=0.5', 'getvcp', '10']
+    
+    @patch('monitor_control.ddc.DDCController._run')
     def test_parse_value_output_formats(self, mock_run):
         """Test parsing different ddcutil output formats."""
         # Mock ddcutil check
@@ -138,6 +460,170 @@ Display 2
         assert maximum == 100  # Default when max not specified
 
 
+class TestCapabilities:
+    """Test parsing of monitor capabilities."""
+    
+    def test_parse_formatted_capabilities(self):
+        """Test parsing ddcutil's formatted capabilities listing."""
+        controller = DDCController()
+        output = """
+Model: U2720Q
+MCCS version: 2.1
+Commands:
+   Op Code: 01 (VCP Request)
+   Op Code: E3 (Capabilities Reply)
+VCP Features:
+   Feature: 10 (Brightness)
+   Feature: 12 (Contrast)
+   Feature: 60 (Input Source)
+      Values:
+         0f: DisplayPort-1
+         d6: Not a feature
+"""
+        features = controller._parse_capabilities(output)
+        
+        assert features == [DDCFeature.BRIGHTNESS, DDCFeature.CONTRAST, DDCFeature.INPUT_SOURCE]
+    
+    def test_parse_raw_capabilities(self):
+        """Test parsing a raw MCCS capabilities string."""
+        controller = DDCController()
+        output = "(prot(monitor)type(lcd)cmds(01 02 03 0C E3 F3)vcp(02 10 14(05 06 D6) 60(0F 11 12) B6)mccs_ver(2.1))"
+        
+        features = controller._parse_capabilities(output)
+        
+        assert features == [DDCFeature.BRIGHTNESS, DDCFeature.INPUT_SOURCE]
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_supported_features_cached(self, mock_run):
+        """Test capabilities are read once per display."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="VCP Features:\n   Feature: 10 (Brightness)\n")
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        
+        with patch('monitor_control.ddc._bus_edid_hash', return_value="abc"):
+            controller = DDCController()
+            assert controller.get_supported_features(monitor) == [DDCFeature.BRIGHTNESS]
+            assert controller.get_supported_features(monitor) == [DDCFeature.BRIGHTNESS]
+            assert mock_run.call_count == 1
+            
+            # A new controller finds the same display in the disk cache
+            assert DDCController().get_supported_features(monitor) == [DDCFeature.BRIGHTNESS]
+            assert mock_run.call_count == 1
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_supported_features_fallback_not_cached(self, mock_run):
+        """Test the fallback feature list is not remembered."""
+        mock_run.side_effect = subprocess.CalledProcessError(1, 'ddcutil')
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        controller = DDCController()
+        
+        assert controller.get_supported_features(monitor) == [DDCFeature.BRIGHTNESS, DDCFeature.CONTRAST]
+        controller.get_supported_features(monitor)
+        assert mock_run.call_count == 2
+
+
+class TestLibDDCUtilBackend:
+    """Test DDC controller routing through libddcutil."""
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_get_brightness_uses_library(self, mock_run):
+        """Test that VCP reads go through libddcutil when it is loaded."""
+        mock_run.return_value = MagicMock(returncode=0)
+        lib = MagicMock()
+        lib.get_value.return_value = (60, 100)
+        
+        with patch('monitor_control.ddc.libddcutil.load', return_value=lib):
+            controller = DDCController()
+        
+        mock_run.reset_mock()
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        assert controller.get_brightness(monitor) == (60, 100)
+        lib.get_value.assert_called_once_with(4, 0x10)
+        mock_run.assert_not_called()
+    
+    @patch('monitor_control.ddc.DDCController._run')
+    def test_set_brightness_library_error(self, mock_run):
+        """Test that libddcutil failures surface as DDCError."""
+        mock_run.return_value = MagicMock(returncode=0)
+        lib = MagicMock()
+        lib.set_value.side_effect = LibDDCUtilError("status -3001")
+        
+        with patch('monitor_control.ddc.libddcutil.load', return_value=lib):
+            controller = DDCController()
+        
+        monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+        with pytest.raises(DDCError, match="Failed to set value"):
+            controller.set_brightness(monitor, 75)
+    
+    @patch('subprocess.Popen')
+    def test_detect_uses_library(self, mock_popen):
+        """Test that monitors are listed through libddcutil instead of ddcutil detect."""
+        lib = MagicMock()
+        lib.detect.return_value = [(4, "DEL", "DELL U2415", "7MT0167B2YNL")]
+        
+        with patch('monitor_control.ddc.libddcutil.load', return_value=lib):
+            controller = DDCController()
+        
+        assert controller.detect_monitors() == [Monitor(
+            bus=4, name="DEL DELL U2415", manufacturer="DEL", model="DELL U2415",
+            serial="7MT0167B2YNL")]
+        mock_popen.assert_not_called()
+    
+    def test_library_detect_reuses_display_refs(self):
+        """Test that displays found by detect() are opened without another lookup."""
+        info = DDCA_Display_Info(marker=DDCA_DISPLAY_INFO_MARKER, mfg_id=b"DEL",
+                                 model_name=b"DELL U2415", sn=b"7MT0167B2YNL", dref=0x1234)
+        info.path.io_mode = DDCA_IO_I2C
+        info.path.path = 4
+        
+        class OneDisplayList(ctypes.Structure):
+            _fields_ = [("ct", ctypes.c_int), ("info", DDCA_Display_Info * 1)]
+        
+        records = OneDisplayList(1, (DDCA_Display_Info * 1)(info))
+        
+        def info_list(include_invalid, dlist_loc):
+            dlist_loc._obj.contents = ctypes.cast(
+                ctypes.pointer(records), ctypes.POINTER(DDCA_Display_Info_List)).contents
+            return 0
+        
+        cdll = MagicMock()
+        cdll.ddca_ddcutil_version.return_value = DDCA_Ddcutil_Version_Spec(2, 1, 4)
+        cdll.ddca_get_display_info_list2.side_effect = info_list
+        cdll.ddca_open_display2.return_value = 0
+        cdll.ddca_set_non_table_vcp_value.return_value = 0
+        lib = LibDDCUtil(cdll)
+        
+        assert lib.detect() == [(4, "DEL", "DELL U2415", "7MT0167B2YNL")]
+        cdll.ddca_free_display_info_list.assert_called_once()
+        
+        lib.set_value(4, 0x10, 75)
+        assert cdll.ddca_open_display2.call_args[0][0].value == 0x1234
+        cdll.ddca_create_busno_display_identifier.assert_not_called()
+    
+    def test_failed_call_reopens_display(self):
+        """Test that a failing handle is closed and reopened on the next call."""
+        cdll = MagicMock()
+        for name in ('ddca_create_busno_display_identifier', 'ddca_free_display_identifier',
+                     'ddca_get_display_ref', 'ddca_open_display2', 'ddca_close_display',
+                     'ddca_set_non_table_vcp_value'):
+            getattr(cdll, name).return_value = 0
+        lib = LibDDCUtil(cdll)
+        
+        cdll.ddca_set_non_table_vcp_value.return_value = -3001
+        with pytest.raises(LibDDCUtilError):
+            lib.set_value(4, 0x10, 75)
+        cdll.ddca_close_display.assert_called_once()
+        
+        cdll.ddca_set_non_table_vcp_value.return_value = 0
+        lib.set_value(4, 0x10, 75)
+        assert cdll.ddca_open_display2.call_count == 2
+        assert cdll.ddca_free_display_identifier.call_count == 2
+    
+    def test_decode_value(self):
+        """Test decoding of the raw VCP value record."""
+        value = DDCA_Non_Table_Vcp_Value(mh=0x01, ml=0x2C, sh=0x00, sl=0x4B)
+        assert decode_value(value) == (75, 300)
+
+
 class TestMonitor:
     """Test Monitor dataclass."""
     
@@ -167,6 +653,13 @@ class TestMonitor:
         )
         
         assert monitor.serial is None
+    
+    def test_monitor_bus_arg(self):
+        """Test the ddcutil bus option for a monitor."""
+        monitor = Monitor(bus=5, name="Test", manufacturer="TEST", model="MODEL")
+        
+        assert monitor.bus_arg == '--bus=5'
+        assert 'bus_arg' not in monitor.__dict__
 
 
 class TestDDCFeature:
@@ -178,6 +671,11 @@ class TestDDCFeature:
         assert DDCFeature.CONTRAST.value == 0x12
         assert DDCFeature.INPUT_SOURCE.value == 0x60
         assert DDCFeature.POWER_MODE.value == 0xD6
+    
+    def test_feature_hex_codes(self):
+        """Test DDC feature codes formatted for ddcutil."""
+        assert DDCFeature.BRIGHTNESS.hex_code == '10'
+        assert DDCFeature.POWER_MODE.hex_code == 'd6'
 
 
 if __name__ == '__main__':
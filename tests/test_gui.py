@@ -20,6 +20,48 @@ def test_gui_module_structure():
     assert hasattr(gui, 'main')
     assert hasattr(gui, 'MainWindow')
     assert hasattr(gui, 'MonitorControlWidget')
+    assert hasattr(gui, 'MonitorWorker')
+
+
+def test_monitor_worker_coalesces_writes():
+    """Test that queued writes keep only the latest value per feature."""
+    from unittest.mock import MagicMock
+    from monitor_control.gui import MonitorWorker
+    from monitor_control.ddc import DDCFeature, Monitor
+    
+    worker = MonitorWorker(MagicMock(), Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL"))
+    worker.enqueue(DDCFeature.BRIGHTNESS, 10)
+    worker.enqueue(DDCFeature.CONTRAST, 20)
+    worker.enqueue(DDCFeature.BRIGHTNESS, 30)
+    
+    assert list(worker._pending.items()) == [(DDCFeature.CONTRAST, 20), (DDCFeature.BRIGHTNESS, 30)]
+
+
+
+def test_shutdown_keeps_pending_writes_without_blocking():
+    """Test shutdown queues debounced slider values and returns while a write is in flight."""
+    import threading
+    from unittest.mock import MagicMock
+    from PyQt6.QtWidgets import QApplication
+    from monitor_control.gui import MonitorControlWidget
+    from monitor_control.ddc import DDCFeature, Monitor
+    
+    app = QApplication.instance() or QApplication([])
+    release = threading.Event()
+    controller = MagicMock()
+    controller.set_value.side_effect = lambda monitor, feature, value: release.wait(5)
+    monitor = Monitor(bus=4, name="Test", manufacturer="TEST", model="MODEL")
+    
+    widget = MonitorControlWidget(monitor, controller, (50, 50))
+    widget.worker.enqueue(DDCFeature.CONTRAST, 40)
+    widget.brightness_slider.setValue(70)
+    
+    widget.shutdown()
+    assert widget.worker.isRunning()
+    
+    release.set()
+    assert widget.worker.wait(5000)
+    assert controller.set_value.call_args_list[-1].args == (monitor, DDCFeature.BRIGHTNESS, 70)
 
 
 if __name__ == '__main__':
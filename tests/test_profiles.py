@@ -1,14 +1,75 @@
 """Tests for profile management functionality."""
 
 import pytest
-import tempfile
 import json
 import os
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
-from pathlib import Path
 
 from monitor_control.profiles import ProfileManager, Profile, MonitorSettings, HotkeyManager
-from monitor_control.ddc import Monitor
+from monitor_control.ddc import DDCError, Monitor
+from pynput.keyboard import KeyCode
+
+
+TEST_MONITOR = Monitor(bus=1, name="Test Monitor", manufacturer="TEST", model="MODEL")
+TEST_MONITORS = (
+    Monitor(bus=4, name="Monitor 1", manufacturer="TEST", model="MODEL1"),
+    Monitor(bus=6, name="Monitor 2", manufacturer="TEST", model="MODEL2"),
+)
+
+# profiles.json as save_profiles would write it, for tests of the load path
+PROFILES_JSON = json.dumps({
+    'reading': {
+        'name': 'reading',
+        'description': 'Low contrast for long reads',
+        'monitors': [{'bus': 4, 'brightness': 60, 'contrast': 40, 'name': 'Monitor 1'}]
+    },
+    'movie': {
+        'name': 'movie',
+        'description': '',
+        'monitors': [{'bus': 4, 'brightness': 30, 'contrast': 70, 'name': 'Monitor 1'}]
+    }
+}).encode()
+
+
+@pytest.fixture(scope='module')
+def _ddc_patcher():
+    """Patch DDCController once for the whole module."""
+    patcher = patch('monitor_control.profiles.DDCController')
+    mock_cls = patcher.start()
+    yield mock_cls
+    patcher.stop()
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Per-test config directory for the profile manager."""
+    return tmp_path / "config"
+
+
+@pytest.fixture
+def seeded_config_dir(config_dir):
+    """Config directory that already holds PROFILES_JSON."""
+    config_dir.mkdir()
+    (config_dir / "profiles.json").write_bytes(PROFILES_JSON)
+    return config_dir
+
+
+@pytest.fixture(autouse=True)
+def mock_controller(_ddc_patcher):
+    """Give each test a clean DDCController mock."""
+    _ddc_patcher.reset_mock(return_value=True, side_effect=True)
+    return _ddc_patcher
+
+
+@pytest.fixture
+def manager_with_defaults(mock_controller, config_dir):
+    """Profile manager whose default profiles were built for two monitors."""
+    mock_controller.return_value.detect_monitors.return_value = list(TEST_MONITORS)
+    manager = ProfileManager(str(config_dir))
+    # Build the defaults now, while the mock still reports the monitors
+    manager.list_profiles()
+    return manager
 
 
 class TestMonitorSettings:
@@ -53,34 +114,40 @@ class TestProfile:
 class TestProfileManager:
     """Test ProfileManager functionality."""
     
-    def setup_method(self):
-        """Setup test environment."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_dir = Path(self.temp_dir) / "config"
+    def test_profile_manager_init(self, config_dir):
+        """Test ProfileManager initialization."""
+        manager = ProfileManager(str(config_dir))
         
-    def teardown_method(self):
-        """Cleanup test environment."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+        assert manager.config_dir == config_dir
+        assert config_dir.exists()
+        assert manager.profiles_file == config_dir / "profiles.json"
+        assert manager.settings_file == config_dir / "settings.json"
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_profile_manager_init(self, mock_controller):
-        """Test ProfileManager initialization."""
-        mock_controller.return_value = MagicMock()
+    def test_profile_manager_loads_lazily(self, config_dir, mock_controller):
+        """Test nothing is read or detected until it is needed."""
+        manager = ProfileManager(str(config_dir))
+        
+        mock_controller.assert_not_called()
+        assert not manager.settings_file.exists()
         
-        manager = ProfileManager(str(self.config_dir))
+        assert manager.settings['default_profile'] == 'day'
+        mock_controller.assert_not_called()
         
-        assert manager.config_dir == self.config_dir
-        assert self.config_dir.exists()
-        assert manager.profiles_file == self.config_dir / "profiles.json"
-        assert manager.settings_file == self.config_dir / "settings.json"
+        manager.list_profiles()
+        mock_controller.assert_called_once()
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_save_and_load_profiles(self, mock_controller):
+    def test_profile_manager_shares_controller(self, config_dir, mock_controller):
+        """Test a given controller is used instead of creating one."""
+        controller = SimpleNamespace()
+        manager = ProfileManager(str(config_dir), controller=controller)
+        hotkey_manager = HotkeyManager(manager)
+        
+        assert hotkey_manager.profile_manager.controller is controller
+        mock_controller.assert_not_called()
+    
+    def test_save_and_load_profiles(self, config_dir):
         """Test saving and loading profiles."""
-        mock_controller.return_value = MagicMock()
-        
-        manager = ProfileManager(str(self.config_dir))
+        manager = ProfileManager(str(config_dir))
         
         # Create test profile
         monitor_settings = [MonitorSettings(bus=4, brightness=80, contrast=75, name="Test")]
@@ -93,7 +160,7 @@ class TestProfileManager:
         assert manager.profiles_file.exists()
         
         # Load profiles into new manager
-        manager2 = ProfileManager(str(self.config_dir))
+        manager2 = ProfileManager(str(config_dir))
         
         assert "test" in manager2.profiles
         assert manager2.profiles["test"].name == "test"
@@ -101,12 +168,27 @@ class TestProfileManager:
         assert len(manager2.profiles["test"].monitors) == 1
         assert manager2.profiles["test"].monitors[0].bus == 4
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_save_and_load_settings(self, mock_controller):
-        """Test saving and loading settings."""
-        mock_controller.return_value = MagicMock()
+    @pytest.mark.parametrize("encoder", ["json", "orjson"])
+    def test_profiles_round_trip_with_encoder(self, config_dir, encoder, monkeypatch):
+        """Test profiles survive a save and load with either JSON encoder."""
+        if encoder == "orjson":
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr('monitor_control.profiles.orjson', None)
+        
+        manager = ProfileManager(str(config_dir))
+        manager.profiles = {"test": Profile(
+            name="test",
+            monitors=[MonitorSettings(bus=4, brightness=80, contrast=75, name="Écran")]
+        )}
+        manager.save_profiles()
         
-        manager = ProfileManager(str(self.config_dir))
+        loaded = ProfileManager(str(config_dir)).profiles
+        assert loaded["test"].monitors == manager.profiles["test"].monitors
+    
+    def test_save_and_load_settings(self, config_dir):
+        """Test saving and loading settings."""
+        manager = ProfileManager(str(config_dir))
         
         # Modify settings
         manager.settings["test_setting"] = "test_value"
@@ -116,52 +198,111 @@ class TestProfileManager:
         assert manager.settings_file.exists()
         
         # Load settings into new manager
-        manager2 = ProfileManager(str(self.config_dir))
+        manager2 = ProfileManager(str(config_dir))
         
         assert manager2.settings["test_setting"] == "test_value"
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_create_default_profiles(self, mock_controller):
+    def test_unchanged_save_skips_write(self, config_dir):
+        """Test saving identical data does not rewrite the file."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.save_settings()
+        
+        with patch('monitor_control.profiles.os.replace') as mock_replace:
+            profile_manager.save_settings()
+            mock_replace.assert_not_called()
+            
+            profile_manager.settings['hotkeys_enabled'] = False
+            profile_manager.save_settings()
+            mock_replace.assert_called_once()
+    
+    def test_loaded_settings_not_rewritten(self, config_dir):
+        """Test saving settings just loaded from disk does not rewrite them."""
+        ProfileManager(str(config_dir)).save_settings()
+        
+        manager = ProfileManager(str(config_dir))
+        manager.settings
+        with patch('monitor_control.profiles.os.replace') as mock_replace:
+            manager.save_settings()
+            mock_replace.assert_not_called()
+    
+    def test_create_default_profiles(self, manager_with_defaults):
         """Test default profile creation."""
-        # Mock controller and monitors
-        mock_controller_instance = MagicMock()
-        mock_controller.return_value = mock_controller_instance
-        
-        test_monitors = [
-            Monitor(bus=4, name="Monitor 1", manufacturer="TEST", model="MODEL1"),
-            Monitor(bus=6, name="Monitor 2", manufacturer="TEST", model="MODEL2")
+        assert set(manager_with_defaults.profiles) == {"day", "night", "gaming"}
+        for profile in manager_with_defaults.profiles.values():
+            assert [m.bus for m in profile.monitors] == [4, 6]
+    
+    @pytest.mark.parametrize("profile_name,expected_brightness,expected_contrast", [
+        ("day", 80, 75),
+        ("night", 20, 60),
+        ("gaming", 100, 90),
+    ])
+    def test_default_profile_settings(self, manager_with_defaults, profile_name,
+                                      expected_brightness, expected_contrast):
+        """Test the settings of each default profile."""
+        monitors = manager_with_defaults.profiles[profile_name].monitors
+        assert [(m.brightness, m.contrast) for m in monitors] == \
+            [(expected_brightness, expected_contrast)] * len(TEST_MONITORS)
+    
+    def test_apply_profile_reuses_detection(self, config_dir, mock_controller):
+        """Test back-to-back profile applications detect monitors once."""
+        mock_instance = mock_controller.return_value
+        mock_instance.detect_monitors.side_effect = lambda: [TEST_MONITOR]
+        
+        profile_manager = ProfileManager(str(config_dir))
+        mock_instance.detect_monitors.reset_mock()
+        
+        assert profile_manager.apply_profile('day')
+        assert profile_manager.apply_profile('night')
+        assert mock_instance.detect_monitors.call_count == 1
+        
+        plan = profile_manager._apply_plans['day'][2]
+        profile_manager.forget_applied_profile()
+        assert profile_manager.apply_profile('day')
+        assert profile_manager._apply_plans['day'][2] is plan
+        
+        profile_manager.invalidate_monitor_cache()
+        profile_manager.apply_profile('day')
+        assert mock_instance.detect_monitors.call_count == 2
+        assert profile_manager._apply_plans['day'][2] is not plan
+    
+    def test_reapply_within_cooldown_is_noop(self, config_dir, mock_controller):
+        """Test applying the same profile twice in a row writes once."""
+        mock_instance = mock_controller.return_value
+        mock_instance.detect_monitors.return_value = [TEST_MONITOR]
+        
+        profile_manager = ProfileManager(str(config_dir))
+        assert profile_manager.apply_profile('night')
+        assert profile_manager.apply_profile('night')
+        assert mock_instance.set_values.call_count == 1
+        
+        profile_manager.forget_applied_profile()
+        assert profile_manager.apply_profile('night')
+        assert mock_instance.set_values.call_count == 2
+    
+    def test_apply_profile_partial_failure(self, config_dir, mock_controller):
+        """Test one failing monitor does not stop writes to the others."""
+        monitors = [
+            Monitor(bus=1, name="First", manufacturer="TEST", model="MODEL"),
+            Monitor(bus=2, name="Second", manufacturer="TEST", model="MODEL"),
         ]
-        mock_controller_instance.detect_monitors.return_value = test_monitors
         
-        manager = ProfileManager(str(self.config_dir))
+        def set_values(monitor, values):
+            if monitor.bus == 1:
+                raise DDCError("Monitor unplugged")
         
-        # Should have created default profiles
-        assert "day" in manager.profiles
-        assert "night" in manager.profiles
-        assert "gaming" in manager.profiles
+        mock_instance = mock_controller.return_value
+        mock_instance.detect_monitors.return_value = monitors
+        mock_instance.set_values.side_effect = set_values
         
-        # Check day profile
-        day_profile = manager.profiles["day"]
-        assert len(day_profile.monitors) == 2
-        assert day_profile.monitors[0].brightness == 80
-        assert day_profile.monitors[0].contrast == 75
+        profile_manager = ProfileManager(str(config_dir))
         
-        # Check night profile
-        night_profile = manager.profiles["night"]
-        assert night_profile.monitors[0].brightness == 20
-        assert night_profile.monitors[0].contrast == 60
-        
-        # Check gaming profile
-        gaming_profile = manager.profiles["gaming"]
-        assert gaming_profile.monitors[0].brightness == 100
-        assert gaming_profile.monitors[0].contrast == 90
+        assert not profile_manager.apply_profile('day')
+        written = {call.args[0].bus for call in mock_instance.set_values.call_args_list}
+        assert written == {1, 2}
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_delete_profile(self, mock_controller):
+    def test_delete_profile(self, config_dir):
         """Test profile deletion."""
-        mock_controller.return_value = MagicMock()
-        
-        manager = ProfileManager(str(self.config_dir))
+        manager = ProfileManager(str(config_dir))
         
         # Add test profile
         monitor_settings = [MonitorSettings(bus=4, brightness=80, contrast=75, name="Test")]
@@ -177,12 +318,18 @@ class TestProfileManager:
         result = manager.delete_profile("non_existent")
         assert result is False
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_list_profiles(self, mock_controller):
-        """Test listing profiles."""
-        mock_controller.return_value = MagicMock()
+    def test_delete_profile_persists(self, seeded_config_dir):
+        """Test a deleted profile stays deleted for the next manager."""
+        manager = ProfileManager(str(seeded_config_dir))
+        assert manager.list_profiles() == ['reading', 'movie']
+        
+        assert manager.delete_profile('movie')
         
-        manager = ProfileManager(str(self.config_dir))
+        assert ProfileManager(str(seeded_config_dir)).list_profiles() == ['reading']
+    
+    def test_list_profiles(self, config_dir):
+        """Test listing profiles."""
+        manager = ProfileManager(str(config_dir))
         
         # Should have default profiles
         profiles = manager.list_profiles()
@@ -195,48 +342,158 @@ class TestProfileManager:
 class TestHotkeyManager:
     """Test HotkeyManager functionality."""
     
-    def setup_method(self):
-        """Setup test environment."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_dir = Path(self.temp_dir) / "config"
-    
-    def teardown_method(self):
-        """Cleanup test environment."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
-    
-    @patch('monitor_control.profiles.DDCController')
-    @patch('monitor_control.profiles.keyboard.Listener')
-    def test_hotkey_manager_init(self, mock_listener, mock_controller):
+    def test_hotkey_manager_init(self, config_dir, monkeypatch):
         """Test HotkeyManager initialization."""
-        mock_controller.return_value = MagicMock()
+        monkeypatch.setattr('monitor_control.profiles.keyboard.Listener', MagicMock())
         
-        profile_manager = ProfileManager(str(self.config_dir))
+        profile_manager = ProfileManager(str(config_dir))
         hotkey_manager = HotkeyManager(profile_manager)
         
         assert hotkey_manager.profile_manager == profile_manager
         assert hotkey_manager.listener is None
         assert not hotkey_manager.enabled
     
-    @patch('monitor_control.profiles.DDCController')
-    def test_load_hotkeys(self, mock_controller):
+    def test_load_hotkeys(self, config_dir):
         """Test hotkey configuration loading."""
-        mock_controller.return_value = MagicMock()
-        
-        profile_manager = ProfileManager(str(self.config_dir))
+        profile_manager = ProfileManager(str(config_dir))
         hotkey_manager = HotkeyManager(profile_manager)
         
         # Should have loaded default hotkeys
         assert len(hotkey_manager.hotkey_combinations) > 0
         
         # Test that hotkey combinations are properly converted
-        actions = []
-        for keys, action in hotkey_manager.hotkey_combinations.items():
-            actions.append(action)
+        actions = set(hotkey_manager.hotkey_combinations.values())
         
         assert "day_profile" in actions
         assert "night_profile" in actions
         assert "gaming_profile" in actions
+    
+    def test_hotkey_fires_once_while_held(self, config_dir):
+        """Test a held combo fires once and fires again after release."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.settings['hotkeys'] = {'day_profile': ['d', '1']}
+        hotkey_manager = HotkeyManager(profile_manager)
+        hotkey_manager.execute_action = MagicMock()
+        
+        with patch('monitor_control.profiles.time.monotonic', return_value=100.0):
+            for key in (KeyCode.from_char('d'), KeyCode.from_char('1'), KeyCode.from_char('1')):
+                hotkey_manager.on_key_press(key)
+        hotkey_manager.execute_action.assert_called_once_with('day_profile')
+        
+        hotkey_manager.on_key_release(KeyCode.from_char('1'))
+        with patch('monitor_control.profiles.time.monotonic', return_value=100.1):
+            hotkey_manager.on_key_press(KeyCode.from_char('1'))
+        # Within the throttle window
+        assert hotkey_manager.execute_action.call_count == 1
+        
+        hotkey_manager.on_key_release(KeyCode.from_char('1'))
+        with patch('monitor_control.profiles.time.monotonic', return_value=101.0):
+            hotkey_manager.on_key_press(KeyCode.from_char('1'))
+        assert hotkey_manager.execute_action.call_count == 2
+    
+    def test_throttle_applies_per_combo(self, config_dir):
+        """Test a different hotkey right after another one still fires."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.settings['hotkeys'] = {'day_profile': ['d', '1'], 'night_profile': ['n', '2']}
+        hotkey_manager = HotkeyManager(profile_manager)
+        hotkey_manager.execute_action = MagicMock()
+        
+        with patch('monitor_control.profiles.time.monotonic', return_value=100.0):
+            for key in (KeyCode.from_char('d'), KeyCode.from_char('1')):
+                hotkey_manager.on_key_press(key)
+            for key in (KeyCode.from_char('d'), KeyCode.from_char('1')):
+                hotkey_manager.on_key_release(key)
+        with patch('monitor_control.profiles.time.monotonic', return_value=100.1):
+            for key in (KeyCode.from_char('n'), KeyCode.from_char('2')):
+                hotkey_manager.on_key_press(key)
+        
+        assert [c.args[0] for c in hotkey_manager.execute_action.call_args_list] == \
+            ['day_profile', 'night_profile']
+    
+    def test_unbound_keys_skip_dispatch(self, config_dir):
+        """Test keys that trigger no hotkey are ignored."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.settings['hotkeys'] = {'night_profile': ['n', '2']}
+        hotkey_manager = HotkeyManager(profile_manager)
+        hotkey_manager.execute_action = MagicMock()
+        
+        assert set(hotkey_manager._dispatch) == {KeyCode.from_char('n'), KeyCode.from_char('2')}
+        for key in (KeyCode.from_char('x'), KeyCode.from_char('2'), KeyCode.from_char('n')):
+            hotkey_manager.on_key_press(key)
+        hotkey_manager.execute_action.assert_called_once_with('night_profile')
+    
+    def test_pressed_keys_tracked_as_bits(self, config_dir):
+        """Test only keys used by hotkeys are tracked in the pressed mask."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.settings['hotkeys'] = {'gaming_profile': ['g', '3']}
+        hotkey_manager = HotkeyManager(profile_manager)
+        hotkey_manager.execute_action = MagicMock()
+        
+        hotkey_manager.on_key_press(KeyCode.from_char('x'))
+        assert hotkey_manager._pressed_mask == 0
+        
+        hotkey_manager.on_key_press(KeyCode.from_char('g'))
+        hotkey_manager.on_key_release(KeyCode.from_char('g'))
+        hotkey_manager.on_key_press(KeyCode.from_char('3'))
+        hotkey_manager.execute_action.assert_not_called()
+        
+        hotkey_manager.stop()
+        assert hotkey_manager._pressed_mask == 0
+    
+    def test_brightness_steps_coalesced(self, config_dir):
+        """Test holding a brightness hotkey sums its auto-repeats into one adjustment."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.settings['hotkeys'] = {'brightness_up': ['b', 'u'], 'brightness_down': ['b', 'd']}
+        hotkey_manager = HotkeyManager(profile_manager)
+        hotkey_manager.adjust_all_brightness = MagicMock()
+        modifier, up, down = KeyCode.from_char('b'), KeyCode.from_char('u'), KeyCode.from_char('d')
+        
+        with patch('monitor_control.profiles.BRIGHTNESS_FLUSH_DELAY', 60):
+            hotkey_manager.on_key_press(modifier)
+            for _ in range(3):
+                hotkey_manager.on_key_press(up)
+            hotkey_manager.on_key_release(up)
+            hotkey_manager.on_key_press(down)
+            hotkey_manager.on_key_release(down)
+            hotkey_manager.on_key_press(up)
+            hotkey_manager.on_key_release(up)
+            hotkey_manager.on_key_release(modifier)
+        hotkey_manager._flush_timer.cancel()
+        hotkey_manager._flush_brightness()
+        
+        hotkey_manager.adjust_all_brightness.assert_called_once_with(30)
+    
+    def test_steps_during_slow_flush_wait_for_it(self, config_dir):
+        """Test steps pressed while a flush is writing are applied after it, not alongside."""
+        profile_manager = ProfileManager(str(config_dir))
+        profile_manager.settings['hotkeys'] = {'brightness_up': ['b', 'u']}
+        hotkey_manager = HotkeyManager(profile_manager)
+        modifier, up = KeyCode.from_char('b'), KeyCode.from_char('u')
+        timers = []
+        
+        def slow_adjust(delta):
+            # Keys auto-repeat while the first write is still in progress
+            if len(hotkey_manager.adjust_all_brightness.call_args_list) == 1:
+                hotkey_manager.on_key_press(up)
+                hotkey_manager.on_key_press(up)
+                timers.append(hotkey_manager._flush_timer)
+        
+        hotkey_manager.adjust_all_brightness = MagicMock(side_effect=slow_adjust)
+        
+        with patch('monitor_control.profiles.BRIGHTNESS_FLUSH_DELAY', 60):
+            hotkey_manager.on_key_press(modifier)
+            hotkey_manager.on_key_press(up)
+            first = hotkey_manager._flush_timer
+            first.cancel()
+            hotkey_manager._flush_brightness()
+            
+            # No second flush was armed during the write; it is armed once it returns
+            assert timers == [first]
+            hotkey_manager._flush_timer.cancel()
+            hotkey_manager._flush_brightness()
+        
+        assert [c.args[0] for c in hotkey_manager.adjust_all_brightness.call_args_list] == [10, 20]
+        assert hotkey_manager._flush_timer is None
 
 
 if __name__ == '__main__':